@@ -1,6 +1,6 @@
 from setuptools import setup, find_packages
 
-with open("README.md", "r", encoding="utf-8") as fh:
+with open("readme.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
 with open("requirements.txt", "r", encoding="utf-8") as fh:
@@ -16,6 +16,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/gmastrantoni/thermal_analyzer.git",
     packages=find_packages(),
+    package_data={"thermal_digger": ["resources/*"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Science/Research",
@@ -30,7 +31,8 @@ setup(
     install_requires=requirements,
     entry_points={
         "console_scripts": [
-            "thermal-analyzer=thermal_analyzer.main:main",
+            "thermal-analyzer=thermal_digger.main:main",
+            "thermal-digger-extract=thermal_digger.cli:main",
         ],
     },
 )
\ No newline at end of file
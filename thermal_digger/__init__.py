@@ -5,12 +5,19 @@ Thermal Analyzer
 A tool for analyzing thermal images and time series data.
 """
 
-from thermal_digger.utils.config import config
-from thermal_digger.thermal_data import ThermalDataHandler
-from thermal_digger.thermal_plot import ThermalPlotter
-from thermal_digger.utils.camera_types import CameraType
-from image_analysis.edge_detector import ThermalEdgeDetector, EdgeDetectionMethod
-from image_analysis.comparison_detector import ThermalComparisonDetector, ComparisonMethod
+import os
+import sys
+
+# The modules import each other by their top-level names (as when running
+# main.py as a script), so the package directory has to be importable. It is
+# appended, so modules of the host program are never shadowed by ours.
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+if _package_dir not in sys.path:
+    sys.path.append(_package_dir)
+
+from utils.config import config
+from thermal_data import ThermalDataHandler
+from utils.camera_types import CameraType
 
 
 __version__ = config.VERSION
@@ -26,4 +33,18 @@ __all__ = [
     'EdgeDetectionMethod',
     'ThermalComparisonDetector',
     'ComparisonMethod'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Import the GUI classes on first use, so headless use does not need Tk."""
+    if name == 'ThermalPlotter':
+        from thermal_plot import ThermalPlotter
+        return ThermalPlotter
+    if name in ('ThermalEdgeDetector', 'EdgeDetectionMethod'):
+        import image_analysis.edge_detector as module
+        return getattr(module, name)
+    if name in ('ThermalComparisonDetector', 'ComparisonMethod'):
+        import image_analysis.comparison_detector as module
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,311 @@
+"""
+Headless batch extraction of point and polygon time series.
+
+Example:
+    thermal-digger-extract /data/site1 --camera mobotix --selections site1.json --output site1.csv
+
+The selections file is JSON with optional "points" and "polygons" lists:
+    {
+        "points": [{"name": "P1", "x": 120, "y": 80}, [200, 45]],
+        "polygons": [{"name": "roof", "coords": [[10, 10], [200, 30], [100, 200]],
+                      "statistics": ["mean", "p95"]}]
+    }
+Points without a name are called Point_1, Point_2, ...; polygons Polygon_1, ...
+Polygon statistics default to config.POLYGON_STATISTICS.
+
+With --pixel-stats DIR, per-pixel count, mean, std, min and max maps of the
+whole series are also written to DIR as .npy files.
+
+Files that cannot be read (e.g. still being written) are skipped: their rows
+are left empty and they are listed on stderr. The exit code is non-zero only
+if no file could be read, or with --strict on the first unreadable file.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from thermal_catalog import get_catalog_entries
+from thermal_cube import ThermalCube
+from thermal_ingest import ingest_files, IngestError
+from thermal_stats import compute_pixel_statistics
+from thermal_series import (
+    extract_point_series, extract_polygon_statistics, get_pixel_indices, get_polygon_mask,
+    get_polygon_statistic_names, get_statistic_label, compute_statistics
+)
+from utils.camera_types import CameraType
+from utils.config import config
+
+
+def find_files(inputs):
+    """
+    Expand directories and glob patterns to a list of CSV files.
+
+    Parameters:
+        inputs (list): Directories, glob patterns or file paths
+
+    Returns:
+        list: Unique CSV file paths
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = [os.path.join(item, name) for name in os.listdir(item)
+                       if name.lower().endswith(config.SUPPORTED_EXTENSIONS)]
+        else:
+            matches = glob.glob(item)
+        files.extend(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return list(dict.fromkeys(files))
+
+
+def load_selections(path):
+    """
+    Read point and polygon definitions from a JSON file.
+
+    Returns:
+        tuple: (points, polygons) with points as [(name, x, y)] and polygons
+            as [(name, coords, statistics)]
+
+    Raises:
+        ValueError: If the file does not define valid selections
+    """
+    with open(path, 'r') as f:
+        selections = json.load(f)
+
+    points = []
+    for index, point in enumerate(selections.get('points', [])):
+        if isinstance(point, dict):
+            points.append((point.get('name', f"Point_{index + 1}"), float(point['x']), float(point['y'])))
+        else:
+            x, y = point
+            points.append((f"Point_{index + 1}", float(x), float(y)))
+
+    polygons = []
+    for index, polygon in enumerate(selections.get('polygons', [])):
+        if not isinstance(polygon, dict):
+            polygon = {'coords': polygon}
+        coords = [[float(x), float(y)] for x, y in polygon['coords']]
+        if len(coords) < 3:
+            raise ValueError(f"Polygon {index + 1} needs at least 3 points")
+        polygons.append((polygon.get('name', f"Polygon_{index + 1}"), coords,
+                         get_polygon_statistic_names(polygon.get('statistics'))))
+
+    if not points and not polygons:
+        raise ValueError(f"No points or polygons defined in {path}")
+    return points, polygons
+
+
+def extract_from_files(files, camera_type, points, polygons, max_workers=None, progress_callback=None,
+                       on_error=None):
+    """
+    Extract all selections while the files are parsed on the worker pool.
+
+    Each frame is reduced to its selection values as soon as it arrives,
+    so only one frame at a time is held in memory. With on_error (see
+    ingest_files), files that fail to parse are skipped and their rows are NaN.
+
+    Returns:
+        tuple: ((T, n_points) array, {polygon name: statistics table})
+    """
+    xs, ys = get_pixel_indices([(x, y) for _, x, y in points])
+    point_series = np.full((len(files), len(points)), np.nan)
+    polygon_tables = {name: {stat: np.full(len(files), np.nan) for stat in statistics}
+                      for name, _, statistics in polygons}
+
+    def reduce_frame(index, data):
+        height, width = data.shape
+        inside = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+        point_series[index, inside] = data[ys[inside], xs[inside]]
+        for name, coords, statistics in polygons:
+            masked_data = get_polygon_mask(coords, data.shape).gather(data)
+            if len(masked_data) == 0:
+                continue
+            for stat, column in compute_statistics(masked_data[None, :], statistics).items():
+                polygon_tables[name][stat][index] = column[0]
+
+    ingest_files(files, camera_type, max_workers=max_workers, on_result=reduce_frame,
+                 on_error=on_error, progress_callback=progress_callback)
+    return point_series, polygon_tables
+
+
+def build_table(files, timestamps, points, point_series, polygons, polygon_tables):
+    """Assemble the extracted series into one DataFrame, one row per frame."""
+    columns = {
+        'Timestamp': [ts.strftime('%Y-%m-%d %H:%M:%S') for ts in timestamps],
+        'File': [os.path.basename(f) for f in files]
+    }
+    for index, (name, _, _) in enumerate(points):
+        columns[name] = point_series[:, index]
+    for name, _, _ in polygons:
+        for stat, values in polygon_tables[name].items():
+            columns[f"{name}_{get_statistic_label(stat)}_Temperature"] = values
+    return pd.DataFrame(columns)
+
+
+def write_table(table, output, output_format=None):
+    """
+    Write the series table as CSV or Parquet.
+
+    Parameters:
+        output_format (str): "csv" or "parquet", defaults to the output extension
+
+    Raises:
+        ImportError: If Parquet is requested without a Parquet engine installed
+    """
+    if output_format is None:
+        output_format = "parquet" if output.lower().endswith(".parquet") else "csv"
+    output_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(output_dir, exist_ok=True)
+    if output_format == "parquet":
+        table.to_parquet(output, index=False)
+    else:
+        table.to_csv(output, index=False, float_format='%.3f')
+
+
+def report_failed(failed):
+    """List the files that could not be read on stderr."""
+    if failed:
+        print(f"Warning: Skipped {len(failed)} files that could not be read:", file=sys.stderr)
+        for filepath, error in failed.items():
+            print(f"  {os.path.basename(filepath)}: {error}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(
+        prog="thermal-digger-extract",
+        description="Extract point and polygon temperature time series from thermal CSV files.")
+    parser.add_argument("inputs", nargs="+",
+                        help="Directories, glob patterns (quoted) or CSV files")
+    parser.add_argument("-c", "--camera", choices=["auto", "mobotix", "flir"], default="auto",
+                        help="Camera type of the files (default: detected from the first file)")
+    parser.add_argument("-s", "--selections",
+                        help="JSON file with the points and polygons to extract")
+    parser.add_argument("-o", "--output",
+                        help="Output file (.csv or .parquet), required with --selections")
+    parser.add_argument("--pixel-stats", metavar="DIR",
+                        help="Also write per-pixel statistic maps of all frames to DIR")
+    parser.add_argument("-f", "--format", choices=["csv", "parquet"],
+                        help="Output format (default: from the output extension)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Worker processes for parsing (default: one per CPU)")
+    parser.add_argument("--no-cube", action="store_true",
+                        help="Do not build or reuse the memory-mapped cube store")
+    parser.add_argument("--strict", action="store_true",
+                        help="Stop at the first file that cannot be read (default: skip it)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="Only report errors")
+    args = parser.parse_args(argv)
+    if args.selections is None and args.pixel_stats is None:
+        parser.error("nothing to do: give --selections and/or --pixel-stats")
+    if args.selections is not None and args.output is None:
+        parser.error("--output is required with --selections")
+    return args
+
+
+def main(argv=None):
+    """
+    Run the batch extraction.
+
+    Returns:
+        int: Process exit code
+    """
+    args = parse_args(argv)
+
+    def report(message):
+        if not args.quiet:
+            print(message, file=sys.stderr)
+
+    try:
+        points, polygons = load_selections(args.selections) if args.selections else ([], [])
+        files = find_files(args.inputs)
+        if not files:
+            print("Error: No CSV files found", file=sys.stderr)
+            return 1
+
+        failed = {}  # File -> error, for the files that could not be read
+
+        def skip_file(filepath, error):
+            failed[filepath] = error
+
+        def skip_parsed_file(index, error):
+            skip_file(error.filepath, error.error)
+
+        # Timestamps and camera types come from the catalog, without re-reading unchanged files
+        entries = get_catalog_entries(files, on_error=None if args.strict else skip_file)
+        n_files = len(files)
+        readable = [i for i, entry in enumerate(entries) if entry is not None]
+        if not readable:
+            report_failed(failed)
+            print("Error: None of the files could be read", file=sys.stderr)
+            return 1
+        if args.camera == "auto":
+            camera_type = entries[readable[0]]['camera_type']
+        else:
+            camera_type = CameraType.from_string(args.camera)
+        # Files whose header cannot be read have no timestamp and no row
+        order = sorted(readable, key=lambda i: (entries[i]['timestamp'] is None,
+                                                entries[i]['timestamp'] or 0, files[i]))
+        files = [files[i] for i in order]
+        timestamps = [entries[i]['timestamp'] for i in order]
+        if any(ts is None for ts in timestamps):
+            print("Error: Could not determine the timestamp of every file", file=sys.stderr)
+            return 1
+        report(f"{len(files)} {camera_type} files, {len(points)} points, {len(polygons)} polygons")
+
+        def progress(completed, total):
+            if completed == total or completed % 100 == 0:
+                report(f"Parsed {completed}/{total} files")
+
+        cube = None
+        if not args.no_cube and config.CUBE_STORE_ENABLED:
+            try:
+                cube = ThermalCube.open_or_build(files, camera_type, timestamps=timestamps,
+                                                 max_workers=args.workers, progress_callback=progress)
+            except IngestError as e:
+                if args.strict:
+                    raise
+                # A cube has no place for unreadable files
+                report(f"Warning: Could not build cube store, reading files directly: {e}")
+
+        if args.selections:
+            if cube is not None:
+                point_series = extract_point_series([(x, y) for _, x, y in points], files, camera_type, cube=cube)
+                polygon_tables = {name: extract_polygon_statistics(coords, files, camera_type, cube=cube,
+                                                                   statistics=statistics)
+                                  for name, coords, statistics in polygons}
+            else:
+                point_series, polygon_tables = extract_from_files(
+                    files, camera_type, points, polygons, max_workers=args.workers,
+                    progress_callback=progress, on_error=None if args.strict else skip_parsed_file)
+                if len(failed) == n_files:
+                    report_failed(failed)
+                    print("Error: None of the files could be read", file=sys.stderr)
+                    return 1
+
+            table = build_table(files, timestamps, points, point_series, polygons, polygon_tables)
+            write_table(table, args.output, args.format)
+            report(f"Wrote {len(table)} rows to {args.output}")
+
+        if args.pixel_stats:
+            compute_pixel_statistics(cube if cube is not None else files, args.pixel_stats,
+                                     camera_type=camera_type)
+            report(f"Wrote per-pixel statistics to {args.pixel_stats}")
+
+        if cube is not None:
+            cube.close()
+        report_failed(failed)
+    except IngestError as e:
+        print(f"Error: Failed to load file {os.path.basename(e.filepath)}: {e.error}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, KeyError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ from matplotlib.figure import Figure
 import os
 from datetime import datetime
 from utils.config import config
+from utils.jobs import check_cancelled
 from image_analysis.comparison_detector import ThermalComparisonDetector
 
 
@@ -389,10 +390,7 @@ class ComparisonAnalysisFrame(ttk.Frame):
         
         try:
             # Load the selected file data
-            file_path = self.main_app.csv_files[index]
-            from thermal_data import ThermalDataHandler
-            self.master_data = ThermalDataHandler.load_csv_data(
-                file_path, self.main_app.camera_type)
+            self.master_data = self.main_app.get_frame(index)
             self.master_timestamp = self.main_app.timestamps[index]
             
             # Update button states
@@ -420,10 +418,7 @@ class ComparisonAnalysisFrame(ttk.Frame):
         
         try:
             # Load the selected file data
-            file_path = self.main_app.csv_files[index]
-            from thermal_data import ThermalDataHandler
-            self.slave_data = ThermalDataHandler.load_csv_data(
-                file_path, self.main_app.camera_type)
+            self.slave_data = self.main_app.get_frame(index)
             self.slave_timestamp = self.main_app.timestamps[index]
             
             # Update button states
@@ -514,128 +509,155 @@ class ComparisonAnalysisFrame(ttk.Frame):
             self.save_button.config(state="disabled")
     
     def compare_images(self):
-        """Compare master and slave images with selected method."""
+        """
+        Compare master and slave images with selected method.
+        
+        The comparison runs as a background job of the main application;
+        comparing again before it finishes supersedes it.
+        """
         if self.master_data is None or self.slave_data is None:
             messagebox.showwarning("Missing Data", "Both master and slave images must be selected.")
             return
         
+        # Read the parameters here, Tk variables must not be used from the worker thread
         try:
-            # Get comparison method and parameters
             method = self.compare_method_var.get()
-            
-            # Perform comparison based on selected method
+            parameters = {'method': method}
             if method == "Direct Difference":
-                # Get direct difference parameters
-                threshold = self.diff_threshold_var.get()
-                relative = self.relative_diff_var.get()
-                preproc = self.preproc_var.get()
-                window_size = self.window_size_var.get() if preproc != "None" else None
-                
-                # Perform comparison with selected method
-                if preproc == "Gradient":
-                    result = self.comparison_detector.compute_gradient_preprocessed_difference(
-                        self.master_data, 
-                        self.slave_data, 
-                        window_size=window_size,
-                        threshold=threshold, 
-                        relative=relative
-                    )
-                elif preproc == "Smoothing":
-                    # First smooth the data, then compute difference
-                    result = self.comparison_detector.compute_smoothed_difference(
-                        self.master_data, 
-                        self.slave_data, 
-                        window_size=window_size,
-                        threshold=threshold, 
-                        relative=relative
-                    )
-                else:
-                    # Regular direct difference
-                    result = self.comparison_detector.compute_difference(
-                        self.master_data, 
-                        self.slave_data, 
-                        threshold=threshold, 
-                        relative=relative
-                    )
-                
-            elif method == "Statistical Change":
-                # Get statistical change parameters
-                zscore_threshold = self.zscore_var.get()
-                window_size = self.stats_window_var.get()
-                
-                # Perform statistical comparison
-                result = self.comparison_detector.compute_statistical_significance(
-                    self.master_data, 
-                    self.slave_data, 
-                    window_size=window_size, 
-                    zscore_threshold=zscore_threshold
-                )
-                
-            elif method == "Correlation":
-                # Get correlation parameters
-                window_size = self.corr_window_var.get()
-                corr_threshold = self.corr_threshold_var.get()
-                
-                # Perform correlation analysis
-                result = self.comparison_detector.compute_spatial_correlation(
-                    self.master_data, 
-                    self.slave_data, 
-                    window_size=window_size,
-                    threshold=corr_threshold
-                )
-            
-            # Store results for later use
-            self.last_results = {
-                'method': method,
-                'master_data': self.master_data,
-                'slave_data': self.slave_data,
-                'master_timestamp': self.master_timestamp,
-                'slave_timestamp': self.slave_timestamp,
-                'result': result,
-                'parameters': {
-                    'method': method,
-                    # Additional parameters will be added based on method
-                }
-            }
-            
-            # Add method-specific parameters
-            if method == "Direct Difference":
-                self.last_results['parameters'].update({
+                parameters.update({
                     'threshold': self.diff_threshold_var.get(),
                     'relative': self.relative_diff_var.get(),
                     'preprocessing': self.preproc_var.get(),
                     'window_size': self.window_size_var.get() if self.preproc_var.get() != "None" else None
                 })
             elif method == "Statistical Change":
-                self.last_results['parameters'].update({
+                parameters.update({
                     'zscore_threshold': self.zscore_var.get(),
                     'window_size': self.stats_window_var.get()
                 })
             elif method == "Correlation":
-                self.last_results['parameters'].update({
+                parameters.update({
                     'window_size': self.corr_window_var.get(),
                     'correlation_threshold': self.corr_threshold_var.get()
                 })
+        except (tk.TclError, ValueError) as e:
+            # e.g. an empty or non-numeric spinbox
+            messagebox.showerror("Comparison Error", f"Error during image comparison: {str(e)}")
+            return
+        
+        master_data, slave_data = self.master_data, self.slave_data
+        master_timestamp, slave_timestamp = self.master_timestamp, self.slave_timestamp
+        
+        def show_results(outcome):
+            result, metrics = outcome
+            # Store results for later use
+            self.last_results = {
+                'method': method,
+                'master_data': master_data,
+                'slave_data': slave_data,
+                'master_timestamp': master_timestamp,
+                'slave_timestamp': slave_timestamp,
+                'result': result,
+                'parameters': parameters,
+                'metrics': metrics
+            }
             
-            # Calculate metrics
-            metrics = self.comparison_detector.calculate_metrics(result)
-            self.last_results['metrics'] = metrics
+            try:
+                # Visualize results
+                self.visualize_results()
+                
+                # Display metrics
+                self.display_metrics(metrics)
+                
+                # Enable save button
+                self.save_button.config(state="normal")
+                
+                # Call callback if provided
+                if self.on_analyze_callback:
+                    self.on_analyze_callback(self.last_results)
             
-            # Visualize results
-            self.visualize_results()
+            except Exception as e:
+                show_error(e)
+        
+        def show_error(error):
+            messagebox.showerror("Comparison Error", f"Error during image comparison: {str(error)}")
+        
+        self.main_app.jobs.submit(("comparison", id(self)), self.run_comparison,
+                                  master_data, slave_data, parameters,
+                                  on_done=show_results, on_error=show_error, owner=self,
+                                  cancellable=True)
+    
+    def run_comparison(self, master_data, slave_data, parameters, cancel_event=None):
+        """
+        Compute a comparison and its metrics. Runs on a worker thread.
+        
+        Parameters:
+            master_data (numpy.ndarray): Master image
+            slave_data (numpy.ndarray): Slave image
+            parameters (dict): Method and its parameters, as read by compare_images
+            cancel_event (threading.Event): Set when the job is superseded
             
-            # Display metrics
-            self.display_metrics(metrics)
+        Returns:
+            tuple: (result, metrics)
+        """
+        method = parameters['method']
+        
+        # Perform comparison based on selected method
+        if method == "Direct Difference":
+            preproc = parameters['preprocessing']
+            if preproc == "Gradient":
+                result = self.comparison_detector.compute_gradient_preprocessed_difference(
+                    master_data, 
+                    slave_data, 
+                    window_size=parameters['window_size'],
+                    threshold=parameters['threshold'], 
+                    relative=parameters['relative']
+                )
+            elif preproc == "Smoothing":
+                # First smooth the data, then compute difference
+                result = self.comparison_detector.compute_smoothed_difference(
+                    master_data, 
+                    slave_data, 
+                    window_size=parameters['window_size'],
+                    threshold=parameters['threshold'], 
+                    relative=parameters['relative']
+                )
+            else:
+                # Regular direct difference
+                result = self.comparison_detector.compute_difference(
+                    master_data, 
+                    slave_data, 
+                    threshold=parameters['threshold'], 
+                    relative=parameters['relative']
+                )
             
-            # Enable save button
-            self.save_button.config(state="normal")
+        elif method == "Statistical Change":
+            # Perform statistical comparison
+            result = self.comparison_detector.compute_statistical_significance(
+                master_data, 
+                slave_data, 
+                window_size=parameters['window_size'], 
+                zscore_threshold=parameters['zscore_threshold']
+            )
             
-            # Call callback if provided
-            if self.on_analyze_callback:
-                self.on_analyze_callback(self.last_results)
-                
-        except Exception as e:
-            messagebox.showerror("Comparison Error", f"Error during image comparison: {str(e)}")
+        elif method == "Correlation":
+            # Perform correlation analysis
+            result = self.comparison_detector.compute_spatial_correlation(
+                master_data, 
+                slave_data, 
+                window_size=parameters['window_size'],
+                threshold=parameters['correlation_threshold']
+            )
+        else:
+            raise ValueError(f"Unknown comparison method: {method}")
+        
+        # The detectors run as single library calls that cannot be interrupted,
+        # a superseded job stops before computing the metrics
+        check_cancelled(cancel_event)
+        
+        # Calculate metrics
+        metrics = self.comparison_detector.calculate_metrics(result)
+        return result, metrics
     
     def visualize_results(self):
         """Visualize the comparison results."""
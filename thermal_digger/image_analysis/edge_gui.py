@@ -11,6 +11,7 @@ from matplotlib.figure import Figure
 import os
 from datetime import datetime
 from utils.config import config
+from utils.jobs import check_cancelled
 from image_analysis.edge_detector import ThermalEdgeDetector, EdgeDetectionMethod
 
 class EdgeDetectionFrame(ttk.Frame):
@@ -307,42 +308,38 @@ class EdgeDetectionFrame(ttk.Frame):
             self.canny_frame.pack_forget()
     
     def analyze_image(self):
-        """Analyze the current image for edge detection."""
+        """
+        Analyze the current image for edge detection.
+        
+        The detection runs as a background job of the main application;
+        analyzing again before it finishes supersedes it.
+        """
         # Check if there's a current image
         if not hasattr(self.main_app, 'current_data') or self.main_app.current_data is None:
             messagebox.showwarning("No Data", "No thermal data available for analysis.")
             return
         
+        # Get current thermal data
+        thermal_data = self.main_app.current_data
+        
+        # Get parameters (Tk variables must not be used from the worker thread)
         try:
-            # Get current thermal data
-            thermal_data = self.main_app.current_data
-            
-            # Get parameters
             method = self.method_var.get().lower()
-            sigma = self.sigma_var.get()
-            threshold = self.threshold_var.get()
-            
-            # Additional parameters for Canny
-            low_threshold = None
-            high_threshold = None
-            
-            if method == "canny":
-                low_threshold = self.low_threshold_var.get()
-                high_threshold = self.high_threshold_var.get()
-            
-            # Perform edge detection
-            edges, gradient_magnitude, edge_directions = self.edge_detector.detect_edges(
-                thermal_data, 
-                method=method, 
-                threshold=threshold, 
-                sigma=sigma,
-                low_threshold=low_threshold,
-                high_threshold=high_threshold
-            )
-            
-            # Calculate edge metrics
-            metrics = self.edge_detector.calculate_edge_metrics(edges, thermal_data)
-            
+            parameters = {
+                'method': method,
+                'sigma': self.sigma_var.get(),
+                'threshold': self.threshold_var.get(),
+                # Additional parameters for Canny
+                'low_threshold': self.low_threshold_var.get() if method == "canny" else None,
+                'high_threshold': self.high_threshold_var.get() if method == "canny" else None
+            }
+        except (tk.TclError, ValueError) as e:
+            # e.g. an empty or non-numeric spinbox
+            messagebox.showerror("Analysis Error", f"Error during edge detection: {str(e)}")
+            return
+        
+        def show_results(outcome):
+            edges, gradient_magnitude, edge_directions, metrics = outcome
             # Store results for later use
             self.last_results = {
                 'thermal_data': thermal_data,
@@ -350,27 +347,60 @@ class EdgeDetectionFrame(ttk.Frame):
                 'gradient_magnitude': gradient_magnitude,
                 'edge_directions': edge_directions,
                 'metrics': metrics,
-                'parameters': {
-                    'method': method,
-                    'sigma': sigma,
-                    'threshold': threshold,
-                    'low_threshold': low_threshold,
-                    'high_threshold': high_threshold
-                }
+                'parameters': parameters
             }
             
-            # Visualize results
-            self.visualize_results()
-            
-            # Display metrics
-            self.display_metrics(metrics)
-            
-            # Call analyze callback if provided
-            if self.on_analyze_callback:
-                self.on_analyze_callback(self.last_results)
+            try:
+                # Visualize results
+                self.visualize_results()
                 
-        except Exception as e:
-            messagebox.showerror("Analysis Error", f"Error during edge detection: {str(e)}")
+                # Display metrics
+                self.display_metrics(metrics)
+                
+                # Call analyze callback if provided
+                if self.on_analyze_callback:
+                    self.on_analyze_callback(self.last_results)
+            
+            except Exception as e:
+                show_error(e)
+        
+        def show_error(error):
+            messagebox.showerror("Analysis Error", f"Error during edge detection: {str(error)}")
+        
+        self.main_app.jobs.submit(("edges", id(self)), self.run_edge_detection,
+                                  thermal_data, parameters,
+                                  on_done=show_results, on_error=show_error, owner=self,
+                                  cancellable=True)
+    
+    def run_edge_detection(self, thermal_data, parameters, cancel_event=None):
+        """
+        Detect edges and compute their metrics. Runs on a worker thread.
+        
+        Parameters:
+            thermal_data (numpy.ndarray): Image to analyze
+            parameters (dict): Method and its parameters, as read by analyze_image
+            cancel_event (threading.Event): Set when the job is superseded
+        
+        Returns:
+            tuple: (edges, gradient_magnitude, edge_directions, metrics)
+        """
+        # Perform edge detection
+        edges, gradient_magnitude, edge_directions = self.edge_detector.detect_edges(
+            thermal_data, 
+            method=parameters['method'], 
+            threshold=parameters['threshold'], 
+            sigma=parameters['sigma'],
+            low_threshold=parameters['low_threshold'],
+            high_threshold=parameters['high_threshold']
+        )
+        
+        # The detectors run as single library calls that cannot be interrupted,
+        # a superseded job stops before computing the metrics
+        check_cancelled(cancel_event)
+        
+        # Calculate edge metrics
+        metrics = self.edge_detector.calculate_edge_metrics(edges, thermal_data)
+        return edges, gradient_magnitude, edge_directions, metrics
     
     def visualize_results(self):
         """Visualize the edge detection results."""
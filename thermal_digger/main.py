@@ -3,11 +3,25 @@ from tkinter import filedialog, ttk, messagebox
 import numpy as np
 import os
 import platform
+import queue
+import threading
+import time
+from datetime import datetime
 from PIL import Image, ImageTk
 from thermal_data import ThermalDataHandler
+from thermal_ingest import ingest_files, IngestError, IngestCancelled
+from thermal_cube import ThermalCube
+from thermal_catalog import get_catalog, get_catalog_entries
+from thermal_stats import HistogramIndex
+from thermal_series import (
+    PointSeriesStore, extract_point_series, extract_polygon_statistics, append_polygon_statistics
+)
+from thermal_follow import DirectoryWatcher
+from thermal_cache import frame_cache, FramePrefetcher
 from thermal_plot import ThermalPlotter, DeltaAnalysisWindow
 from utils.config import config
 from utils.camera_types import CameraType
+from utils.jobs import JobScheduler
 from image_analysis_launcher import add_change_detection_launcher
 
 import webbrowser
@@ -44,6 +58,15 @@ class ThermalImageGUI:
         self.global_min = None
         self.global_max = None
         self.camera_type = CameraType.MOBOTIX  # Default camera type
+        self.cube = None  # Memory-mapped store of the loaded frames
+        self.histograms = None  # HistogramIndex of the loaded frames
+        self.file_entries = {}  # Catalog entry (timestamp, dimensions, metadata) per file
+        self.watcher = None  # DirectoryWatcher of the followed directory
+        self.follow_job = None  # Pending root.after() poll of the followed directory
+        self.prefetcher = FramePrefetcher()  # Loads neighbouring frames while browsing
+        self.point_series = None  # Series of the selected points, extended per click
+        self.loading = None  # State of the background load of a dataset, see load_csv_files
+        self.jobs = JobScheduler(self.root)  # Background analyses, shared with the analysis windows
         
         # Create main frames
         self.control_frame = ttk.Frame(self.root, padding="5")
@@ -184,6 +207,11 @@ class ThermalImageGUI:
         files_frame.grid_rowconfigure(0, weight=1)
         load_button.grid(row=0, column=0, padx=5, pady=5, sticky='n')
         
+        # Follow mode: append new files written to the data directory
+        self.follow_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(files_frame, text="Follow Directory", variable=self.follow_var,
+                        command=self.toggle_follow_mode).grid(row=1, column=0, pady=2)
+        
         # Add separator
         ttk.Separator(self.control_frame, orient='horizontal').grid(
             row=2, column=0, sticky='ew', pady=10)
@@ -353,20 +381,29 @@ class ThermalImageGUI:
                 filetypes=[("CSV files", "*.csv")])
                 
         if files:
+            # A new dataset replaces the followed one and any calculation on the old one
+            self.stop_follow_mode()
+            self.jobs.cancel_all()
+            
             # DEBUG ---------------------
             # Enable debug output for sorting issues
             from utils.debug_tools import debug_file_sorting
             # debug_file_sorting(files)
             
-            # First, extract timestamps for all files
+            # First, look up timestamps and dimensions of all files in the catalog
+            try:
+                entries = get_catalog_entries(files)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to read file metadata: {str(e)}")
+                return
+            
             file_timestamps = []
-            for f in files:
-                try:
-                    timestamp = ThermalDataHandler.extract_datetime_from_filename(f)
-                    file_timestamps.append((f, timestamp))
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to extract timestamp from {os.path.basename(f)}: {str(e)}")
-                    return
+            self.file_entries = {}
+            for f, entry in zip(files, entries):
+                # Files without a timestamp fall back to the current date, as before
+                timestamp = entry['timestamp'] or datetime.now()
+                file_timestamps.append((f, timestamp))
+                self.file_entries[f] = entry
             
             # Sort files by timestamp
             file_timestamps.sort(key=lambda x: x[1])
@@ -380,68 +417,339 @@ class ThermalImageGUI:
             for i, (file, timestamp) in enumerate(file_timestamps):
                 print(f"{i+1}. {os.path.basename(file)} - {timestamp}")
             
-            # Show progress dialog for loading files
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Loading Files")
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            progress_window.geometry("300x100")
-            progress_window.resizable(False, False)
-            
-            progress_label = ttk.Label(progress_window, text="Loading files...")
-            progress_label.pack(pady=10)
-            
-            progress_bar = ttk.Progressbar(progress_window, mode='determinate', length=250)
-            progress_bar.pack(pady=10)
-            
-            progress_window.update()
-            
-            # Determine global min and max values across all files
-            min_val = float('inf')
-            max_val = float('-inf')
-            
-            for idx, csv_file in enumerate(self.csv_files):
-                progress_label.config(text=f"Loading file {idx+1} of {len(self.csv_files)}...")
-                progress_bar['value'] = (idx / len(self.csv_files)) * 100
-                progress_window.update()
-                
-                try:
-                    data = ThermalDataHandler.load_csv_data(csv_file, self.camera_type)
-                    min_val = min(min_val, np.percentile(data, 15))
-                    max_val = max(max_val, np.percentile(data, 95))
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to load file {os.path.basename(csv_file)}: {str(e)}")
-                    # Close progress window and return
-                    progress_window.destroy()
-                    return
-            
-            # Round min to nearest integer (floor) and max to nearest integer (ceiling)
-            self.global_min = round(min_val)
-            self.global_max = round(max_val)
-            
+            # Drop the previous dataset, the new one is loaded in the background
+            if self.cube is not None:
+                self.cube.close()
+                self.cube = None
+            self.histograms = None
+            self.prefetcher.cancel()
             self.current_image_index = 0
+            self.global_min = None
+            self.global_max = None
             
-            # Close progress window
-            progress_window.destroy()
-            
-            # Update the display with the first image
-            self.update_image_display()
+            # Parse all files on a worker thread, the dialog is updated by polling
+            self.loading = {
+                'messages': queue.Queue(),
+                'cancel': threading.Event(),
+                'dialog': LoadProgressDialog(self.root, len(self.csv_files), self.cancel_loading),
+                'job': None
+            }
+            threading.Thread(
+                target=self.load_dataset_worker,
+                args=(list(self.csv_files), list(self.timestamps), self.camera_type,
+                      self.loading['messages'], self.loading['cancel']),
+                daemon=True
+            ).start()
+            self.poll_loading()
+
+    def load_dataset_worker(self, files, timestamps, camera_type, messages, cancel_event):
+        """
+        Load a dataset on a worker thread.
+        
+        Touches no Tk state: the first frame, progress and the result are
+        posted to `messages` and picked up by poll_loading on the Tk thread.
+        """
+        try:
+            messages.put(("first_frame", frame_cache.get(files[0], camera_type)))
             
-            # Show camera type and image dimensions info
+            def report_progress(completed, total):
+                messages.put(("progress", completed, total))
+            cube, histograms = self.ingest_dataset(files, timestamps, camera_type,
+                                                   report_progress, cancel_event)
+            messages.put(("done", cube, histograms))
+        except IngestCancelled:
+            messages.put(("cancelled",))
+        except Exception as e:
+            messages.put(("error", e))
+
+    def poll_loading(self):
+        """Apply the messages of the load worker and schedule the next poll"""
+        loading = self.loading
+        loading['job'] = None
+        progress = None
+        while True:
             try:
+                message = loading['messages'].get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == "progress":
+                # Only the latest progress is worth drawing
+                progress = message[1:]
+            elif kind == "first_frame":
+                self.show_first_frame(message[1])
+            else:
+                self.finish_loading(message)
+                return
+        
+        if progress is not None:
+            loading['dialog'].update_progress(*progress)
+        loading['job'] = self.root.after(100, self.poll_loading)
+
+    def show_first_frame(self, data):
+        """Display the first frame while the rest of the dataset is loading"""
+        # Provisional colour range of this frame, replaced by the dataset range when loaded
+        with np.errstate(all='ignore'):
+            low, high = np.nanpercentile(data, [15, 95])
+        if np.isfinite(low) and np.isfinite(high):
+            self.global_min, self.global_max = round(low), round(high)
+        self.update_image_display()
+
+    def cancel_loading(self):
+        """Stop the background load; the remaining files are not parsed"""
+        if self.loading is not None:
+            self.loading['cancel'].set()
+            self.loading['dialog'].set_cancelling()
+
+    def finish_loading(self, message):
+        """Install the loaded dataset, or clean up after an error or cancellation"""
+        self.loading['dialog'].close()
+        self.loading = None
+        kind = message[0]
+        
+        if kind == "cancelled":
+            self.clear_workspace()
+            return
+        if kind == "error":
+            error = message[1]
+            if isinstance(error, IngestError):
+                messagebox.showerror("Error", f"Failed to load file {os.path.basename(error.filepath)}: {str(error.error)}")
+            else:
+                messagebox.showerror("Error", f"Failed to load files: {str(error)}")
+            self.clear_workspace()
+            return
+        
+        _, self.cube, self.histograms = message
+
+        # Determine global min and max values across all files from the histograms
+        min_val, max_val = self.histograms.color_range()
+
+        # Round min to nearest integer (floor) and max to nearest integer (ceiling)
+        self.global_min = round(min_val)
+        self.global_max = round(max_val)
+        
+        # Update the display with the dataset's colour range
+        self.update_image_display()
+        self.prefetch_neighbours()
+        
+        # Show camera type and image dimensions info
+        try:
+            entry = self.file_entries[self.csv_files[0]]
+            width, height = entry['width'], entry['height']
+            if width is None or height is None:
                 width, height = ThermalDataHandler.get_dimensions_from_metadata(
                     self.csv_files[0], self.camera_type)
-                messagebox.showinfo("Files Loaded", 
-                                f"Loaded {len(self.csv_files)} files\n"
-                                f"Camera type: {str(self.camera_type)}\n"
-                                f"Image dimensions: {width}x{height}\n"
-                                f"Temperature range: {self.global_min}°C to {self.global_max}°C")
-            except Exception:
-                messagebox.showinfo("Files Loaded", 
-                                f"Loaded {len(self.csv_files)} files\n"
-                                f"Camera type: {str(self.camera_type)}\n"
-                                f"Temperature range: {self.global_min}°C to {self.global_max}°C")
+            messagebox.showinfo("Files Loaded", 
+                            f"Loaded {len(self.csv_files)} files\n"
+                            f"Camera type: {str(self.camera_type)}\n"
+                            f"Image dimensions: {width}x{height}\n"
+                            f"Temperature range: {self.global_min}°C to {self.global_max}°C")
+        except Exception:
+            messagebox.showinfo("Files Loaded", 
+                            f"Loaded {len(self.csv_files)} files\n"
+                            f"Camera type: {str(self.camera_type)}\n"
+                            f"Temperature range: {self.global_min}°C to {self.global_max}°C")
+
+
+    def ingest_dataset(self, files, timestamps, camera_type, progress_callback=None, cancel_event=None):
+        """
+        Parse a set of files and return (cube, histograms).
+        
+        When the cube store is enabled the frames are consolidated into a
+        memory-mapped ThermalCube, which is reused as-is (histograms included)
+        if the files are unchanged. Otherwise cube is None and only the
+        HistogramIndex is built. Runs on the load worker thread.
+        
+        Raises:
+            IngestError: If a file cannot be parsed
+            IngestCancelled: If cancel_event was set
+        """
+        if config.CUBE_STORE_ENABLED:
+            try:
+                cube = ThermalCube.open_or_build(
+                    files, camera_type, timestamps=timestamps,
+                    progress_callback=progress_callback, cancel_event=cancel_event)
+                return cube, cube.histograms
+            except (OSError, ValueError) as e:
+                # e.g. frames of different sizes or a read-only cache location
+                print(f"Warning: Could not build cube store, reading files directly: {e}")
+        
+        # Keep only per-frame summaries, frames are loaded on demand
+        summaries = ingest_files(files, camera_type, summaries_only=True,
+                                 progress_callback=progress_callback, cancel_event=cancel_event)
+        return None, HistogramIndex.from_summaries(summaries)
+
+    def toggle_follow_mode(self):
+        """Start or stop following the directory of the loaded files"""
+        if not self.follow_var.get():
+            self.stop_follow_mode()
+            return
+        
+        if not self.csv_files:
+            messagebox.showwarning("Warning", "Load CSV files first, their directory will be followed.")
+            self.follow_var.set(False)
+            return
+        
+        directory = os.path.dirname(os.path.abspath(self.csv_files[-1]))
+        self.watcher = DirectoryWatcher(directory, self.csv_files)
+        self.poll_followed_directory()
+
+    def stop_follow_mode(self):
+        """Stop following the data directory"""
+        if self.follow_job is not None:
+            self.root.after_cancel(self.follow_job)
+            self.follow_job = None
+        self.watcher = None
+        self.follow_var.set(False)
+
+    def poll_followed_directory(self):
+        """Append new files of the followed directory and schedule the next check"""
+        self.follow_job = None
+        if self.watcher is None:
+            return
+        
+        try:
+            # New files are only taken while no earlier ones are being parsed
+            if not self.jobs.is_pending("append_files"):
+                new_files = self.watcher.poll()
+                if new_files:
+                    self.append_files(new_files)
+        except Exception as e:
+            # Keep following, the files are retried on the next change
+            print(f"Warning: Could not add new files from {self.watcher.directory}: {e}")
+        
+        self.follow_job = self.root.after(int(config.FOLLOW_POLL_SECONDS * 1000),
+                                          self.poll_followed_directory)
+
+    def append_files(self, new_files):
+        """
+        Append new files to the loaded dataset.
+        
+        Only the new files are parsed, by a background job; add_frames then
+        extends the cube store, the histograms and the current point or
+        polygon series with the new frames. Files that fail to load are
+        skipped, and retried on a later check of the followed directory.
+        """
+        new_files = list(new_files)
+        
+        def report_error(error):
+            print(f"Warning: Could not add new files: {error}")
+            self.retry_files(new_files)
+        
+        self.jobs.submit("append_files", self.read_new_files, new_files, self.camera_type,
+                         on_done=self.add_frames, on_error=report_error, cancellable=True)
 
+    @staticmethod
+    def read_new_files(new_files, camera_type, cancel_event=None):
+        """
+        Parse files to append, in time order. Runs on a worker thread.
+        
+        Files that cannot be read are left out of the result.
+        
+        Returns:
+            tuple: (files, timestamps, catalog entries, frames, frame summaries,
+                failed), failed being a list of (file, error) pairs
+        """
+        failed = []
+        described = []
+        for filepath in new_files:
+            try:
+                described.append((filepath, get_catalog(os.path.dirname(filepath)).get(filepath)))
+            except Exception as e:
+                failed.append((filepath, e))
+        described.sort(key=lambda item: item[1]['timestamp'] or datetime.now())
+        
+        def skip_file(index, error):
+            failed.append((error.filepath, error.error))
+        
+        results = ingest_files([filepath for filepath, _ in described], camera_type,
+                               with_summaries=True, on_error=skip_file, cancel_event=cancel_event)
+        parsed = [(filepath, entry, result) for (filepath, entry), result in zip(described, results)
+                  if result is not None]
+        new_files = [filepath for filepath, _, _ in parsed]
+        entries = [entry for _, entry, _ in parsed]
+        timestamps = [entry['timestamp'] or datetime.now() for entry in entries]
+        frames = [result[0] for _, _, result in parsed]
+        summaries = [result[1] for _, _, result in parsed]
+        return new_files, timestamps, entries, frames, summaries, failed
+    
+    def retry_files(self, failed_files):
+        """Let the followed directory report files that failed to load again, up to a limit"""
+        if self.watcher is None:
+            return
+        for filepath in self.watcher.forget(failed_files):
+            print(f"Warning: Giving up on {os.path.basename(filepath)} after "
+                  f"{config.FOLLOW_MAX_ATTEMPTS} failed attempts")
+
+    def add_frames(self, parsed):
+        """Extend the loaded dataset with the parsed new files (see read_new_files)"""
+        new_files, new_timestamps, entries, frames, summaries, failed = parsed
+        
+        for filepath, error in failed:
+            print(f"Warning: Could not add new file {os.path.basename(filepath)}: {error}")
+        self.retry_files([filepath for filepath, _ in failed])
+        if not new_files:
+            return
+        
+        was_at_end = self.current_image_index == len(self.csv_files) - 1
+        # A calculation in progress is for the old frames, it is redone below
+        recalculate = self.jobs.is_pending("time_series")
+        self.jobs.cancel("time_series")
+        
+        if self.cube is not None:
+            try:
+                self.cube.append(new_files, new_timestamps, frames, summaries)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not extend cube store, reading files directly: {e}")
+                self.cube.close()
+                self.cube = None
+        if self.cube is not None:
+            self.histograms = self.cube.histograms
+        else:
+            self.histograms = self.histograms.extended(summaries)
+        
+        self.csv_files.extend(new_files)
+        self.timestamps.extend(new_timestamps)
+        self.file_entries.update(zip(new_files, entries))
+        
+        min_val, max_val = self.histograms.color_range()
+        self.global_min = round(min_val)
+        self.global_max = round(max_val)
+        
+        # Extend the current selection's series with the new samples only
+        series_data = self.plotter.current_timeseries_data
+        if recalculate:
+            self.calculate_time_series()
+        elif series_data['selection_type'] == 'point' and self.point_series is not None:
+            if self.point_series.is_for(self.csv_files, self.camera_type, self.cube):
+                self.point_series.append_frames(frames)
+                self.plotter.plot_time_series(self.timestamps, self.point_series.values)
+            else:
+                self.calculate_time_series()
+        elif series_data['selection_type'] == 'polygon' and series_data['statistics'] is not None:
+            statistics = append_polygon_statistics(series_data['statistics'], self.polygon_coords,
+                                                   frames, new_files)
+            series_data.update({
+                'values': {'mean': statistics['mean'].tolist()},
+                'statistics': statistics
+            })
+            self.plotter.plot_time_series(self.timestamps, statistics=statistics)
+        
+        # Keep showing the latest frame if the user was looking at it
+        if was_at_end:
+            self.current_image_index = len(self.csv_files) - 1
+        self.update_image_display()
+
+    def get_frame(self, index):
+        """
+        Return the thermal data of frame `index`.
+        
+        Frames come from the cube store when available (already memory-mapped),
+        otherwise from the shared in-memory frame cache. Returned frames are read-only.
+        """
+        if self.cube is not None:
+            return self.cube.frame(index)
+        return frame_cache.get(self.csv_files[index], self.camera_type)
 
     def change_mode(self):
         """Handle selection mode change"""
@@ -456,8 +764,7 @@ class ThermalImageGUI:
             
         # Load and display current image
         try:
-            self.current_data = ThermalDataHandler.load_csv_data(
-                self.csv_files[self.current_image_index], self.camera_type)
+            self.current_data = self.get_frame(self.current_image_index)
             self.plotter.plot_thermal_image(
                 self.current_data, 
                 self.timestamps[self.current_image_index],
@@ -478,6 +785,7 @@ class ThermalImageGUI:
             
         self.current_image_index += 1
         self.update_image_display()
+        self.prefetch_neighbours(direction=1)
 
     def previous_image(self):
         """Display previous image in the sequence"""
@@ -486,6 +794,15 @@ class ThermalImageGUI:
             
         self.current_image_index -= 1
         self.update_image_display()
+        self.prefetch_neighbours(direction=-1)
+
+    def prefetch_neighbours(self, direction=1):
+        """Load the frames around the current one in the background"""
+        # Cube frames are memory-mapped already, nothing to parse ahead
+        if self.cube is not None or not self.csv_files:
+            return
+        self.prefetcher.prefetch(self.csv_files, self.camera_type,
+                                 self.current_image_index, direction)
 
     def start_polygon(self):
         """Start polygon drawing mode"""
@@ -532,6 +849,8 @@ class ThermalImageGUI:
         self.polygon_coords = []
         self.collecting_points = False
         self.selected_point = None
+        self.point_series = None
+        self.jobs.cancel("time_series")
         self.plotter.clear_selection()
         # Disable delta analysis button
         self.delta_button.config(state=tk.DISABLED)
@@ -539,90 +858,88 @@ class ThermalImageGUI:
         self.interactive_button.config(state=tk.DISABLED)
     
     def calculate_time_series(self):
-        """Calculate and plot time series for multiple points or polygon selection"""
+        """
+        Calculate and plot time series for multiple points or polygon selection.
+        
+        The series are extracted by a background job; a newer selection
+        supersedes a calculation still in progress.
+        """
+        # Any pending result is for an older selection
+        self.jobs.cancel("time_series")
+        
         if self.selection_mode == "point" and self.plotter.points:
-            # Calculate time series for all points
-            point_temperatures = {}
-            
-            for point_idx, (x, y, _) in enumerate(self.plotter.points):
-                temperatures = []
-                x_int, y_int = int(round(x)), int(round(y))
-                
-                for csv_file in self.csv_files:
-                    try:
-                        data = ThermalDataHandler.load_csv_data(csv_file, self.camera_type)
-                        
-                        # Check if coordinates are within the bounds of the data
-                        if 0 <= y_int < data.shape[0] and 0 <= x_int < data.shape[1]:
-                            temperatures.append(data[y_int, x_int])
-                        else:
-                            # Handle out of bounds coordinates
-                            temperatures.append(np.nan)
-                            print(f"Warning: Point ({x_int}, {y_int}) is out of bounds for image {csv_file}")
-                    except Exception as e:
-                        temperatures.append(np.nan)
-                        print(f"Error processing file {csv_file}: {e}")
-                
-                point_temperatures[point_idx] = temperatures
+            # Only extract the series of points that are not in the store yet
+            if self.point_series is None or not self.point_series.is_for(
+                    self.csv_files, self.camera_type, self.cube):
+                self.point_series = PointSeriesStore(self.csv_files, self.camera_type, self.cube)
+            store = self.point_series
+            points = [(x, y) for x, y, _ in self.plotter.points]
+            start, new_points = store.missing_points(points)
+            if not new_points:
+                self.show_point_series([])
+                return
             
-            # Update stored data for export
-            self.plotter.current_timeseries_data.update({
-                'timestamps': self.timestamps,
-                'values': point_temperatures,
-                'selection_type': 'point'
-            })
+            def store_series(columns):
+                self.show_point_series(store.add_series(points, start, columns))
             
-            # Plot all point time series
-            self.plotter.plot_time_series(self.timestamps, point_temperatures)
-            
-            # Enable delta analysis button
-            self.delta_button.config(state=tk.NORMAL)
-            # Also enable interactive plot button
-            self.interactive_button.config(state=tk.NORMAL)
+            self.jobs.submit("time_series", extract_point_series, new_points, self.csv_files,
+                             self.camera_type, cube=self.cube, on_done=store_series,
+                             on_error=self.show_time_series_error, cancellable=True)
             
         elif self.selection_mode == "polygon" and len(self.polygon_coords) >= 3:
-            # Calculate polygon statistics
-            means = []
-            mins = []
-            maxs = []
-            
-            for csv_file in self.csv_files:
-                try:
-                    data = ThermalDataHandler.load_csv_data(csv_file, self.camera_type)
-                    mask = self.plotter.create_polygon_mask(data.shape, self.polygon_coords)
-                    masked_data = data[mask]
-                    
-                    if len(masked_data) > 0:
-                        means.append(np.mean(masked_data))
-                        mins.append(np.min(masked_data))
-                        maxs.append(np.max(masked_data))
-                    else:
-                        means.append(np.nan)
-                        mins.append(np.nan)
-                        maxs.append(np.nan)
-                        print(f"Warning: No data points inside polygon for image {csv_file}")
-                except Exception as e:
-                    means.append(np.nan)
-                    mins.append(np.nan)
-                    maxs.append(np.nan)
-                    print(f"Error processing file {csv_file}: {e}")
-            
-            # Update stored data for export
-            self.plotter.current_timeseries_data.update({
-                'timestamps': self.timestamps,
-                'values': {'mean': means},
-                'mins': mins,
-                'maxs': maxs,
-                'selection_type': 'polygon'
-            })
-            
-            # Plot polygon statistics time series
-            self.plotter.plot_time_series(self.timestamps, {'mean': means}, mins, maxs)
-            
-            # Enable delta analysis button
-            self.delta_button.config(state=tk.NORMAL)
-            # Also enable interactive plot button
-            self.interactive_button.config(state=tk.NORMAL)
+            # Calculate all polygon statistics in one pass over the frames
+            self.jobs.submit("time_series", extract_polygon_statistics, list(self.polygon_coords),
+                             self.csv_files, self.camera_type, cube=self.cube,
+                             on_done=self.show_polygon_statistics,
+                             on_error=self.show_time_series_error, cancellable=True)
+
+    def show_point_series(self, new_indices):
+        """Plot the stored point series, adding only the new points if possible"""
+        point_temperatures = self.point_series.values
+        
+        # Update stored data for export
+        self.plotter.current_timeseries_data.update({
+            'timestamps': self.timestamps,
+            'values': point_temperatures,
+            'selection_type': 'point'
+        })
+        
+        # Add the new points to the plot, or redraw it if the selection changed
+        if new_indices and new_indices[0] > 0:
+            for point_idx in new_indices:
+                self.plotter.add_point_time_series(self.timestamps, point_idx, point_temperatures)
+        else:
+            self.plotter.plot_time_series(self.timestamps, point_temperatures)
+        
+        # Enable delta analysis button
+        self.delta_button.config(state=tk.NORMAL)
+        # Also enable interactive plot button
+        self.interactive_button.config(state=tk.NORMAL)
+
+    def show_polygon_statistics(self, statistics):
+        """Plot the statistics of the selected polygon"""
+        # Update stored data for export
+        self.plotter.current_timeseries_data.update({
+            'timestamps': self.timestamps,
+            'values': {'mean': statistics['mean'].tolist()},
+            'statistics': statistics,
+            'selection_type': 'polygon'
+        })
+        
+        # Plot polygon statistics time series
+        self.plotter.plot_time_series(self.timestamps, statistics=statistics)
+        
+        # Enable delta analysis button
+        self.delta_button.config(state=tk.NORMAL)
+        # Also enable interactive plot button
+        self.interactive_button.config(state=tk.NORMAL)
+
+    def show_time_series_error(self, error):
+        """Report a failed time series calculation"""
+        if isinstance(error, ValueError):
+            messagebox.showerror("Error", f"Failed to calculate polygon statistics: {str(error)}")
+        else:
+            messagebox.showerror("Error", f"Failed to calculate time series: {str(error)}")
 
     
     def setup_delta_analysis_controls(self):
@@ -781,6 +1098,8 @@ class ThermalImageGUI:
     
     def clear_workspace(self):
         """Reset the entire workspace to initial state"""
+        self.stop_follow_mode()
+        self.jobs.cancel_all()
         # Clear data storage
         self.csv_files = []
         self.current_data = None
@@ -791,6 +1110,14 @@ class ThermalImageGUI:
         self.selected_point = None
         self.global_min = None
         self.global_max = None
+        if self.cube is not None:
+            self.cube.close()
+            self.cube = None
+        self.histograms = None
+        self.file_entries = {}
+        self.point_series = None
+        self.prefetcher.cancel()
+        frame_cache.clear()
         # Update image counter
         self.image_label.config(text="Image: 0/0")
         # Clear plots
@@ -800,6 +1127,54 @@ class ThermalImageGUI:
         # Also disable interactive plot button
         self.interactive_button.config(state=tk.DISABLED)
 
+class LoadProgressDialog:
+    """Modal progress dialog of a dataset load, with throughput, ETA and a Cancel button"""
+    def __init__(self, parent, total, on_cancel):
+        self.total = total
+        self.start_time = time.monotonic()
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Loading Files")
+        self.window.transient(parent)
+        self.window.grab_set()
+        self.window.geometry("340x150")
+        self.window.resizable(False, False)
+        # Closing the window cancels the load
+        self.window.protocol("WM_DELETE_WINDOW", on_cancel)
+        
+        self.label = ttk.Label(self.window, text=f"Loading {total} files...")
+        self.label.pack(pady=(10, 5))
+        
+        self.progress_bar = ttk.Progressbar(self.window, mode='determinate', length=300)
+        self.progress_bar.pack(pady=5)
+        
+        self.rate_label = ttk.Label(self.window, text="")
+        self.rate_label.pack(pady=5)
+        
+        self.cancel_button = ttk.Button(self.window, text="Cancel", command=on_cancel)
+        self.cancel_button.pack(pady=5)
+
+    def update_progress(self, completed, total):
+        """Show the files loaded so far, frames per second and the time left"""
+        self.label.config(text=f"Loaded file {completed} of {total}...")
+        self.progress_bar['value'] = (completed / total) * 100
+        elapsed = time.monotonic() - self.start_time
+        if completed and elapsed > 0:
+            rate = completed / elapsed
+            remaining = int((total - completed) / rate)
+            self.rate_label.config(
+                text=f"{rate:.1f} frames/s, {remaining // 60}:{remaining % 60:02d} remaining")
+
+    def set_cancelling(self):
+        """Show that the load is being cancelled"""
+        self.label.config(text="Cancelling...")
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def close(self):
+        """Close the dialog"""
+        self.window.grab_release()
+        self.window.destroy()
+
 class FileNameDialog:
     """Dialog for getting custom filename with optional timestamp"""
     def __init__(self, parent):
@@ -877,8 +1252,10 @@ def main():
     root.geometry(f"+{position_right}+{position_down}")
     
     root.mainloop()
+    app.jobs.shutdown()
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = ThermalImageGUI(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.jobs.shutdown()
\ No newline at end of file
@@ -0,0 +1,395 @@
+"""
+Caches of parsed thermal frames.
+
+Parsing a thermal CSV is by far the most expensive step when browsing a
+dataset, so every parsed frame is stored as a binary .npy array and served
+from there on later loads. Recently used frames are additionally kept in a
+process-wide in-memory LRU cache shared by all windows, which a background
+prefetcher fills with the neighbours of the frame being viewed.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.config import config
+from utils.fixed_point import FixedPointCodec
+
+CACHE_DIRNAME = ".thermal_cache"
+USER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "thermal_digger")
+
+
+class DiskFrameCache:
+    """
+    On-disk cache of parsed frames.
+
+    Entries are keyed by absolute path, file size, modification time and
+    camera type, so any change to a source file (or loading it with a
+    different camera type) simply misses the cache instead of returning
+    stale data.
+
+    With config.FRAME_STORAGE = "fixed", frames are stored as int16 in
+    config.FIXED_POINT_SCALE °C units and decoded to float32 on load, unless
+    the caller keeps them encoded (decode=False) to decode them later.
+    """
+
+    def __init__(self, cache_dir=None, enabled=None):
+        """
+        Initialize the frame cache.
+
+        Parameters:
+            cache_dir (str): Cache directory. Defaults to config.FRAME_CACHE_DIR,
+                or a ".thermal_cache" directory next to the data files
+            enabled (bool): Override config.FRAME_CACHE_ENABLED
+        """
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+
+    def is_enabled(self):
+        """Return True if the cache should be used."""
+        return config.FRAME_CACHE_ENABLED if self.enabled is None else self.enabled
+
+    def get_cache_dir(self, filepath):
+        """Return the cache directory used for the given data file."""
+        if self.cache_dir:
+            return self.cache_dir
+        if config.FRAME_CACHE_DIR:
+            return config.FRAME_CACHE_DIR
+
+        # Keep the cache next to the data, unless that directory is read-only
+        data_dir = os.path.dirname(os.path.abspath(filepath))
+        if os.access(data_dir, os.W_OK):
+            return os.path.join(data_dir, CACHE_DIRNAME)
+        return USER_CACHE_DIR
+
+    @staticmethod
+    def get_codec():
+        """Return the fixed-point codec for the configured storage, or None for float storage."""
+        if config.FRAME_STORAGE == "fixed":
+            return FixedPointCodec(scale=config.FIXED_POINT_SCALE)
+        return None
+
+    @staticmethod
+    def make_key(filepath, camera_type, codec=None):
+        """Build the cache key for a file from its path, size, mtime, camera type and storage."""
+        stat = os.stat(filepath)
+        storage = f"fixed:{codec.scale}:{codec.offset}" if codec else "float"
+        raw = f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}|{camera_type.name}|{storage}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def get_cache_path(self, filepath, camera_type, codec=None):
+        """Return the path of the cached array for a data file."""
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        key = self.make_key(filepath, camera_type, codec)
+        return os.path.join(self.get_cache_dir(filepath), "frames", f"{stem}-{key}.npy")
+
+    def load(self, filepath, camera_type, decode=True):
+        """
+        Load a cached frame.
+
+        Parameters:
+            decode (bool): If False, fixed-point frames are returned as their
+                int16 encoding (decode them with get_codec())
+
+        Returns:
+            numpy.ndarray: The cached frame, or None on a cache miss
+        """
+        if not self.is_enabled():
+            return None
+
+        codec = self.get_codec()
+        try:
+            data = np.load(self.get_cache_path(filepath, camera_type, codec))
+        except (OSError, ValueError):
+            return None
+        return codec.decode(data) if codec and decode else data
+
+    def store(self, filepath, camera_type, data, decode=True):
+        """
+        Store a parsed frame. Failures are reported but never raised.
+
+        Parameters:
+            decode (bool): As for load()
+
+        Returns:
+            numpy.ndarray: The frame as a later load() returns it (with fixed
+                storage, decoded from its encoding, or the encoding itself if
+                decode is False), so a frame is the same whether or not it came
+                from the cache. A frame that cannot be encoded is returned as
+                float32, like decoded frames.
+        """
+        if not self.is_enabled():
+            return data
+
+        codec = self.get_codec()
+        try:
+            cache_path = self.get_cache_path(filepath, camera_type, codec)
+            if codec:
+                try:
+                    stored = codec.encode(data)
+                except ValueError:
+                    # Not cached (reported below), returned like a decoded frame
+                    data = np.asarray(data, dtype=np.float32)
+                    raise
+                data = codec.decode(stored) if decode else stored
+            else:
+                stored = data
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+            # Write to a temporary file first so readers never see partial arrays
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, stored)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not write frame cache for {os.path.basename(filepath)}: {e}")
+        return data
+
+    def clear(self, filepath=None):
+        """
+        Remove cached frames.
+
+        Parameters:
+            filepath (str): Any data file of the dataset whose cache should be
+                cleared. If None, the configured cache directory is cleared.
+        """
+        cache_dir = self.get_cache_dir(filepath) if filepath else (self.cache_dir or config.FRAME_CACHE_DIR)
+        if cache_dir:
+            shutil.rmtree(os.path.join(cache_dir, "frames"), ignore_errors=True)
+
+
+# Process-wide disk cache used by ThermalDataHandler
+disk_frame_cache = DiskFrameCache()
+
+
+class FrameCache:
+    """
+    In-memory LRU cache of parsed frames with a byte budget.
+
+    Entries are keyed by absolute path, camera type, size and modification
+    time. Frames are kept as the disk cache stores them, so with fixed-point
+    storage they take int16 memory and are decoded by get(). Returned arrays
+    are read-only; copy a frame before modifying it. The cache is
+    thread-safe, and a frame requested by several threads at once is only
+    loaded once.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Initialize the frame cache.
+
+        Parameters:
+            max_bytes (int): Memory budget in bytes. Defaults to
+                config.FRAME_MEMORY_CACHE_MB
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._loading = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_max_bytes(self):
+        """Return the memory budget in bytes."""
+        if self.max_bytes is None:
+            return config.FRAME_MEMORY_CACHE_MB * 1024 * 1024
+        return self.max_bytes
+
+    @staticmethod
+    def make_key(filepath, camera_type):
+        """Build the cache key for a file."""
+        stat = os.stat(filepath)
+        return (os.path.abspath(filepath), camera_type.name, stat.st_size, stat.st_mtime_ns)
+
+    def get(self, filepath, camera_type):
+        """
+        Return the frame of a data file, loading it on a cache miss.
+
+        Parameters:
+            filepath (str): Path to the CSV file
+            camera_type (CameraType): Camera type of the file
+
+        Returns:
+            numpy.ndarray: The (read-only) frame
+        """
+        data, codec = self._get_stored(filepath, camera_type)
+        if codec is not None:
+            data = codec.decode(data)
+            data.flags.writeable = False
+        return data
+
+    def preload(self, filepath, camera_type):
+        """Load the frame of a data file into the cache, without decoding it."""
+        self._get_stored(filepath, camera_type)
+
+    def _get_stored(self, filepath, camera_type):
+        """Return the cache entry of a data file as (frame, codec), loading it on a cache miss."""
+        key = self.make_key(filepath, camera_type)
+        while True:
+            with self._lock:
+                entry = self._frames.get(key)
+                if entry is not None:
+                    self._frames.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                loading = self._loading.get(key)
+                if loading is None:
+                    self.misses += 1
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another thread is loading this frame, wait for it and look again
+            loading.wait()
+
+        try:
+            # Imported here as thermal_data itself depends on this module
+            from thermal_data import ThermalDataHandler
+            data = ThermalDataHandler.load_csv_data(filepath, camera_type, decode=False)
+            data.flags.writeable = False
+            # Parsed frames are float; int16 frames are fixed-point encodings
+            codec = disk_frame_cache.get_codec() if data.dtype == np.int16 else None
+            entry = (data, codec)
+            self._put(key, entry)
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+        return entry
+
+    def contains(self, filepath, camera_type):
+        """Return True if the frame of a data file is cached."""
+        try:
+            key = self.make_key(filepath, camera_type)
+        except OSError:
+            return False
+        with self._lock:
+            return key in self._frames
+
+    def _put(self, key, entry):
+        """Insert a (frame, codec) entry and evict least recently used frames over the budget."""
+        max_bytes = self.get_max_bytes()
+        if entry[0].nbytes > max_bytes:
+            return
+        with self._lock:
+            self._frames[key] = entry
+            self._bytes += entry[0].nbytes
+            while self._bytes > max_bytes:
+                _, (evicted, _) = self._frames.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self):
+        """Drop all cached frames and reset the statistics."""
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: 'hits', 'misses', 'frames', 'bytes' and 'max_bytes'
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'frames': len(self._frames),
+                'bytes': self._bytes,
+                'max_bytes': self.get_max_bytes()
+            }
+
+
+# Process-wide in-memory cache shared by the GUI windows
+frame_cache = FrameCache()
+
+
+class FramePrefetcher:
+    """
+    Loads the neighbours of the current frame into a FrameCache on a worker thread.
+
+    Each call to prefetch() replaces the pending work, so frames queued for a
+    position the user has already left are never loaded. A frame that is
+    being parsed when the position changes is finished and kept in the cache.
+    """
+
+    def __init__(self, cache=None, count=None):
+        """
+        Initialize the prefetcher.
+
+        Parameters:
+            cache (FrameCache): Cache to fill, defaults to the shared frame_cache
+            count (int): Frames to prefetch on each side of the current one.
+                Defaults to config.PREFETCH_FRAMES
+        """
+        self.cache = cache if cache is not None else frame_cache
+        self.count = count
+        self._pending = []
+        self._camera_type = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def get_count(self):
+        """Return the number of frames prefetched on each side."""
+        return config.PREFETCH_FRAMES if self.count is None else self.count
+
+    @staticmethod
+    def get_order(index, n_frames, count, direction=1):
+        """
+        Return the frame indices to prefetch around `index`, most useful first.
+
+        Frames in the direction of travel come first, then those behind.
+        """
+        ahead = [index + direction * step for step in range(1, count + 1)]
+        behind = [index - direction * step for step in range(1, count + 1)]
+        return [i for i in ahead + behind if 0 <= i < n_frames]
+
+    def prefetch(self, files, camera_type, index, direction=1):
+        """
+        Queue the neighbours of frame `index` for loading, cancelling older requests.
+
+        Parameters:
+            files (list): CSV files of the dataset, in display order
+            camera_type (CameraType): Camera type of the files
+            index (int): Index of the frame being viewed
+            direction (int): 1 when moving forward, -1 when moving backward
+        """
+        order = self.get_order(index, len(files), self.get_count(), direction)
+        with self._condition:
+            self._pending = [files[i] for i in order]
+            self._camera_type = camera_type
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="frame-prefetch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self):
+        """Drop all pending prefetches."""
+        with self._condition:
+            self._pending = []
+
+    def _run(self):
+        """Worker loop: load pending frames one at a time."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                filepath = self._pending.pop(0)
+                camera_type = self._camera_type
+
+            if self.cache.contains(filepath, camera_type):
+                continue
+            try:
+                self.cache.preload(filepath, camera_type)
+            except Exception as e:
+                # The frame is reported again if the user actually navigates to it
+                print(f"Warning: Could not prefetch {os.path.basename(filepath)}: {e}")
@@ -0,0 +1,306 @@
+"""
+Persistent catalog of the thermal CSV files of a directory.
+
+For every file the catalog records size, modification time, camera type,
+timestamp, frame dimensions and header metadata. It is stored as a
+JSON-lines file in the frame cache directory and updated incrementally, so
+reopening a directory costs one scandir() and no file opens for files that
+have not changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from thermal_cache import disk_frame_cache
+from thermal_data import ThermalDataHandler
+from utils.camera_types import CameraType
+from utils.config import config
+
+# Version 2 stores the raw FLIR time instead of a timestamp with a guessed year
+CATALOG_FORMAT_VERSION = 2
+
+
+def describe_file(filepath, size=None, mtime_ns=None):
+    """
+    Read the header of a thermal CSV file and describe it for the catalog.
+
+    The file is opened once. For FLIR files, whose header has no frame
+    height, the data rows are counted.
+
+    Parameters:
+        filepath (str): Path to the CSV file
+        size (int): File size, if already known from a stat()
+        mtime_ns (int): Modification time, if already known from a stat()
+
+    Returns:
+        dict: Catalog entry with 'name', 'size', 'mtime_ns', 'camera_type',
+            'timestamp' (datetime or None), 'flir_time', 'width', 'height'
+            and 'metadata'. 'flir_time' is the raw FLIR time the timestamp
+            was parsed from, or None.
+    """
+    if size is None or mtime_ns is None:
+        stat = os.stat(filepath)
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+    width = height = timestamp = flir_time = None
+    with open(filepath, 'r') as file:
+        first_line = file.readline()
+        if "Filename = " in first_line:
+            camera_type = CameraType.FLIR
+            header, first_row = ThermalDataHandler._read_flir_header_lines(file)
+            metadata = ThermalDataHandler._parse_flir_metadata([first_line] + header)
+            timestamp = metadata.pop('timestamp')
+            if timestamp is not None:
+                flir_time = metadata['time']
+            if first_row:
+                width = len(first_row.strip().split(','))
+                height = 1 + sum(1 for line in file if ',' in line)
+        else:
+            camera_type = CameraType.MOBOTIX
+            header = [first_line] + [file.readline() for _ in range(config.METADATA_ROWS - 1)]
+            metadata = ThermalDataHandler._parse_mobotix_metadata(header)
+            width, height = metadata.get('width'), metadata.get('height')
+
+    # Same fallback as ThermalDataHandler.extract_datetime_from_filename
+    filename = os.path.basename(filepath)
+    if timestamp is None and re.match(r'\d{8}_\d{6}', filename):
+        timestamp = datetime.strptime(filename[:15], '%Y%m%d_%H%M%S')
+
+    return {
+        'name': filename,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'camera_type': camera_type,
+        'timestamp': timestamp,
+        'flir_time': flir_time,
+        'width': width,
+        'height': height,
+        'metadata': metadata
+    }
+
+
+class DatasetCatalog:
+    """
+    Catalog of the thermal CSV files in one directory.
+
+    The catalog file is append-only: new and changed files are appended as
+    they are described, and the file is rewritten only when entries of
+    removed or changed files make up most of it.
+
+    A catalog is shared by the Tk thread and background jobs; scan, get and
+    the catalog file writes are serialized by a lock.
+    """
+
+    def __init__(self, directory):
+        """
+        Initialize the catalog of a directory and load its catalog file.
+
+        Parameters:
+            directory (str): Data directory
+        """
+        self.directory = os.path.abspath(directory)
+        self.entries = {}  # File name -> entry
+        self._stored_lines = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def path(self):
+        """Path of the catalog file."""
+        key = hashlib.sha1(self.directory.encode("utf-8")).hexdigest()[:20]
+        cache_dir = disk_frame_cache.get_cache_dir(os.path.join(self.directory, "catalog"))
+        return os.path.join(cache_dir, "catalogs", f"{key}.jsonl")
+
+    def load(self):
+        """Load the catalog file. A missing or unreadable catalog is simply empty."""
+        self.entries = {}
+        self._stored_lines = 0
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # e.g. a line cut short by an interrupted write
+                        continue
+                    if record.get('version') != CATALOG_FORMAT_VERSION:
+                        continue
+                    self._stored_lines += 1
+                    self.entries[record['name']] = self._from_record(record)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _to_record(entry):
+        """
+        Serialize an entry to a JSON-compatible dict.
+
+        FLIR times only carry the day of the year, whose year is assumed when
+        they are parsed; they are stored raw and resolved when read, so the
+        year is not frozen at the time a file was first cataloged.
+        """
+        timestamp = entry['timestamp']
+        return dict(
+            entry,
+            version=CATALOG_FORMAT_VERSION,
+            camera_type=entry['camera_type'].name,
+            timestamp=timestamp.isoformat() if timestamp and not entry.get('flir_time') else None
+        )
+
+    @staticmethod
+    def _from_record(record):
+        """Deserialize an entry written by _to_record."""
+        entry = {key: value for key, value in record.items() if key != 'version'}
+        entry['camera_type'] = CameraType[record['camera_type']]
+        if record.get('flir_time'):
+            entry['timestamp'] = ThermalDataHandler._parse_flir_time(record['flir_time'])
+        else:
+            entry['timestamp'] = datetime.fromisoformat(record['timestamp']) if record['timestamp'] else None
+        return entry
+
+    def scan(self, names=None):
+        """
+        Bring the catalog up to date with the directory.
+
+        Only files that are new or whose size or modification time changed
+        are opened. Entries of files that no longer exist are dropped.
+        Changes are written back to the catalog file.
+
+        Parameters:
+            names (list): File names to catalog. Defaults to all CSV files
+                of the directory.
+
+        Returns:
+            dict: File name -> entry, a snapshot of the catalog after the scan
+        """
+        with self._lock:
+            return self._scan(names)
+
+    def _scan(self, names):
+        """Implementation of scan; the caller holds the lock."""
+        listing = {}
+        with os.scandir(self.directory) as scan:
+            for dir_entry in scan:
+                if dir_entry.name.lower().endswith(config.SUPPORTED_EXTENSIONS) and dir_entry.is_file():
+                    listing[dir_entry.name] = dir_entry
+
+        removed = [name for name in self.entries if name not in listing]
+        for name in removed:
+            del self.entries[name]
+
+        added = []
+        for name in (listing if names is None else [name for name in names if name in listing]):
+            stat = listing[name].stat()
+            entry = self.entries.get(name)
+            if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+                entry = describe_file(listing[name].path, stat.st_size, stat.st_mtime_ns)
+                self.entries[name] = entry
+                added.append(entry)
+
+        if added or removed:
+            self._save(added, rewrite=bool(removed))
+        return dict(self.entries)
+
+    def get(self, filepath):
+        """
+        Return the entry of a file of the directory, describing it if needed.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        name = os.path.basename(filepath)
+        stat = os.stat(filepath)
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+                entry = describe_file(filepath, stat.st_size, stat.st_mtime_ns)
+                self.entries[name] = entry
+                self._save([entry])
+        return entry
+
+    def _save(self, added, rewrite=False):
+        """
+        Append new entries, or rewrite the catalog if it is mostly stale.
+        Failures are reported. The caller holds the lock.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if rewrite or self._stored_lines + len(added) > 2 * len(self.entries):
+                tmp_path = f"{self.path}.tmp-{os.getpid()}"
+                with open(tmp_path, 'w') as f:
+                    for entry in self.entries.values():
+                        f.write(json.dumps(self._to_record(entry)) + "\n")
+                os.replace(tmp_path, self.path)
+                self._stored_lines = len(self.entries)
+            else:
+                with open(self.path, 'a') as f:
+                    for entry in added:
+                        f.write(json.dumps(self._to_record(entry)) + "\n")
+                self._stored_lines += len(added)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not update the catalog of {self.directory}: {e}")
+
+
+# Catalogs opened in this session, by directory
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(directory):
+    """Return the (shared) catalog of a directory."""
+    directory = os.path.abspath(directory)
+    with _catalogs_lock:
+        if directory not in _catalogs:
+            _catalogs[directory] = DatasetCatalog(directory)
+        return _catalogs[directory]
+
+
+def get_catalog_entries(files, on_error=None):
+    """
+    Return the catalog entries of a set of files.
+
+    Each directory involved is scanned once; unchanged files are not opened.
+
+    Parameters:
+        files (list): CSV file paths
+        on_error (callable): Called as on_error(filepath, error) for a file
+            that cannot be described. When given, its entry is None instead
+            of raising.
+
+    Returns:
+        list: Catalog entries, in the order of `files`
+
+    Raises:
+        OSError: If a file cannot be read and on_error is not given
+    """
+    names_by_directory = {}
+    for filepath in files:
+        directory = os.path.dirname(os.path.abspath(filepath))
+        names_by_directory.setdefault(directory, []).append(os.path.basename(filepath))
+    scanned = {}
+    for directory, names in names_by_directory.items():
+        try:
+            scanned[directory] = get_catalog(directory).scan(names)
+        except Exception:
+            if on_error is None:
+                raise
+            # Describe the files one by one below, to find the unreadable ones
+            scanned[directory] = {}
+
+    entries = []
+    for filepath in files:
+        directory = os.path.dirname(os.path.abspath(filepath))
+        entry = scanned[directory].get(os.path.basename(filepath))
+        if entry is None:
+            # Not listed by the scan, e.g. a file with another extension
+            try:
+                entry = get_catalog(directory).get(filepath)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(filepath, e)
+        entries.append(entry)
+    return entries
@@ -0,0 +1,362 @@
+"""
+Memory-mapped store for a whole thermal time series.
+
+A ThermalCube consolidates a sorted set of frames into one (T, H, W) array
+on disk, together with the timestamps, the source files and per-frame
+metadata. Opening a cube is instant and the OS pages in only the frames that
+are actually read, so analyses can work on plain array slices instead of
+re-parsing CSV files.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+from thermal_cache import disk_frame_cache
+from thermal_data import ThermalDataHandler
+from thermal_ingest import ingest_files, summarize_frame
+from thermal_stats import HistogramIndex
+from utils.camera_types import CameraType
+from utils.config import config
+from utils.fixed_point import FixedPointCodec
+
+MANIFEST_NAME = "manifest.json"
+FRAMES_NAME = "frames.dat"
+HISTOGRAMS_NAME = "histograms.npz"
+CUBE_FORMAT_VERSION = 3
+
+
+class ThermalCube:
+    """
+    Memory-mapped (T, H, W) array of thermal frames with timestamps and metadata.
+
+    Frames are stored as a raw C-ordered binary file next to a JSON manifest
+    and the per-frame HistogramIndex (`histograms`).
+    Indexing the cube (cube[i], cube[:, y, x], ...) slices the memory map directly.
+
+    Cubes built with storage="fixed" hold int16 values with a per-dataset
+    scale and offset (see FixedPointCodec); indexing decodes only the
+    selected values to float32, while `frames` gives the raw int16 map.
+    """
+
+    def __init__(self, path, manifest, mode='r'):
+        """
+        Initialize a cube from an existing store. Use ThermalCube.open or
+        ThermalCube.build instead of calling this directly.
+
+        Parameters:
+            path (str): Cube directory
+            manifest (dict): Parsed manifest
+            mode (str): numpy.memmap mode ('r' or 'r+')
+        """
+        self.path = path
+        self.manifest = manifest
+        self.camera_type = CameraType[manifest['camera_type']]
+        self.timestamps = [datetime.fromisoformat(ts) for ts in manifest['timestamps']]
+        self.files = [entry['path'] for entry in manifest['files']]
+        self.frame_metadata = manifest['frame_metadata']
+        self.codec = FixedPointCodec.from_dict(manifest['codec']) if manifest.get('codec') else None
+        self.histograms = HistogramIndex.load(os.path.join(path, HISTOGRAMS_NAME))
+        self.frames = np.memmap(
+            os.path.join(path, FRAMES_NAME),
+            dtype=np.dtype(manifest['dtype']),
+            mode=mode,
+            shape=tuple(manifest['shape'])
+        )
+
+    @property
+    def shape(self):
+        """Shape of the cube as (T, H, W)."""
+        return self.frames.shape
+
+    @property
+    def frame_shape(self):
+        """Shape of a single frame as (H, W)."""
+        return self.frames.shape[1:]
+
+    def __len__(self):
+        return self.frames.shape[0]
+
+    @property
+    def storage(self):
+        """Storage mode of the cube, "float" or "fixed"."""
+        return "fixed" if self.codec else "float"
+
+    def __getitem__(self, key):
+        if self.codec:
+            return self.codec.decode(self.frames[key])
+        return self.frames[key]
+
+    def frame(self, index):
+        """
+        Return frame `index` as a plain array: a view of the memory map for
+        float cubes, a decoded float32 copy for fixed-point cubes.
+        """
+        if self.codec:
+            return self.codec.decode(self.frames[index])
+        return np.asarray(self.frames[index])
+
+    def close(self):
+        """
+        Drop the cube's reference to the memory map. The file is unmapped once
+        no frame views returned by the cube are alive any more.
+        """
+        self.frames = None
+
+    def append(self, files, timestamps, frames, summaries):
+        """
+        Append new frames to the end of the cube, on disk and in this object.
+
+        Frames already in the cube are not touched: the raw frame file is
+        extended and the manifest and histograms are rewritten. A cube stored
+        at the default path of its files is moved to the default path of the
+        grown file set, so loading that set later reuses it.
+
+        Parameters:
+            files (list): CSV files of the new frames
+            timestamps (list): Timestamps of the new frames
+            frames (list): The parsed frames
+            summaries (list): Frame summaries (see summarize_frame)
+
+        Raises:
+            ValueError: If a frame has a different size or does not fit the
+                fixed-point range of the cube
+        """
+        for filepath, data in zip(files, frames):
+            if data.shape != self.frame_shape:
+                raise ValueError(f"Frame size {data.shape} of {os.path.basename(filepath)} "
+                                 f"does not match {self.frame_shape}")
+        encoded = [self.codec.encode(data) if self.codec else np.asarray(data, dtype=self.frames.dtype)
+                   for data in frames]
+
+        # Cut off anything left behind by an interrupted append before extending the file
+        frame_bytes = int(np.prod(self.frame_shape)) * self.frames.dtype.itemsize
+        with open(os.path.join(self.path, FRAMES_NAME), 'r+b') as f:
+            f.truncate(len(self) * frame_bytes)
+            f.seek(0, os.SEEK_END)
+            for data in encoded:
+                f.write(np.ascontiguousarray(data).tobytes())
+
+        manifest = dict(self.manifest)
+        manifest['shape'] = [len(self) + len(frames)] + list(self.frame_shape)
+        manifest['timestamps'] = manifest['timestamps'] + [ts.isoformat() for ts in timestamps]
+        manifest['files'] = manifest['files'] + self._file_entries(files)
+        manifest['frame_metadata'] = manifest['frame_metadata'] + [self._metadata_entry(meta) for meta in summaries]
+        tmp_path = os.path.join(self.path, f"{MANIFEST_NAME}.tmp-{os.getpid()}")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST_NAME))
+
+        histograms = self.histograms.extended(summaries)
+        histograms.save(os.path.join(self.path, HISTOGRAMS_NAME))
+
+        old_default_path = self.default_path(self.files, self.camera_type)
+        at_default_path = os.path.abspath(self.path) == os.path.abspath(old_default_path)
+        self.manifest = manifest
+        self.histograms = histograms
+        self.timestamps = self.timestamps + list(timestamps)
+        self.files = self.files + [entry['path'] for entry in manifest['files'][len(self.files):]]
+        self.frame_metadata = manifest['frame_metadata']
+        if at_default_path:
+            self._move(self.default_path(self.files, self.camera_type))
+        # Map the grown file; views of the old map stay valid
+        self.frames = np.memmap(os.path.join(self.path, FRAMES_NAME), dtype=self.frames.dtype,
+                                mode=self.frames.mode, shape=tuple(manifest['shape']))
+
+    def _move(self, path):
+        """
+        Move the store to another directory, replacing any store there.
+        Failures are reported and the store stays where it is.
+        """
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(self.path, path)
+        except OSError as e:
+            # e.g. on Windows, where a directory with mapped files cannot be renamed
+            print(f"Warning: Could not move cube store to {path}: {e}")
+            return
+        self.path = path
+
+    @staticmethod
+    def default_path(files, camera_type):
+        """Default cube directory for a file set, inside the frame cache directory."""
+        key_source = "|".join([camera_type.name] + [os.path.abspath(f) for f in files])
+        key = hashlib.sha1(key_source.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(disk_frame_cache.get_cache_dir(files[0]), "cubes", key)
+
+    @staticmethod
+    def _metadata_entry(summary):
+        """Manifest entry of a frame summary; histograms are stored separately."""
+        return {key: (list(value) if key == 'shape' else value)
+                for key, value in summary.items() if key != 'histogram'}
+
+    @staticmethod
+    def _file_entries(files):
+        """Describe source files by path, size and mtime."""
+        entries = []
+        for filepath in files:
+            stat = os.stat(filepath)
+            entries.append({
+                'path': os.path.abspath(filepath),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            })
+        return entries
+
+    def is_current(self, files, camera_type, storage=None):
+        """Return True if the cube was built from exactly these (unmodified) files."""
+        if storage is None:
+            storage = config.FRAME_STORAGE
+        if camera_type != self.camera_type or len(files) != len(self) or storage != self.storage:
+            return False
+        try:
+            return self._file_entries(files) == self.manifest['files']
+        except OSError:
+            return False
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """
+        Open an existing cube store.
+
+        Raises:
+            FileNotFoundError: If there is no cube at `path`
+            ValueError: If the store was written by an incompatible version or is inconsistent
+        """
+        with open(os.path.join(path, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CUBE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cube format version: {manifest.get('version')}")
+        cube = cls(path, manifest, mode=mode)
+        if len(cube.histograms) != len(cube):
+            # e.g. an append that was interrupted
+            cube.close()
+            raise ValueError("Cube histograms do not match its frames")
+        return cube
+
+    @classmethod
+    def build(cls, files, camera_type, path=None, timestamps=None, dtype=np.float64,
+              storage=None, max_workers=None, progress_callback=None, cancel_event=None):
+        """
+        Build a cube store from a set of thermal CSV files.
+
+        Parameters:
+            files (list): CSV file paths
+            camera_type (CameraType): Camera type of the files
+            path (str): Cube directory, defaults to ThermalCube.default_path
+            timestamps (list): Timestamps of the files. If given, files are
+                assumed to be sorted already; otherwise they are extracted and
+                the files sorted by timestamp.
+            dtype: Storage dtype of the frames for float storage. The default
+                float64 keeps the values returned by the parsers, so series read
+                from the cube equal those read from the files.
+            storage (str): "float" or "fixed" (int16 with a per-dataset offset
+                and config.FIXED_POINT_SCALE). Defaults to config.FRAME_STORAGE.
+            max_workers (int): Worker processes for parsing (see ingest_files)
+            progress_callback (callable): Called as progress_callback(completed, total)
+            cancel_event (threading.Event): Stops the build when set (see ingest_files)
+
+        Returns:
+            ThermalCube: The opened cube
+
+        Raises:
+            ValueError: If there are no files, the frames differ in size or a
+                value does not fit the fixed-point range
+            IngestError: If a file cannot be parsed
+            IngestCancelled: If the build was cancelled; nothing is left on disk
+        """
+        if not files:
+            raise ValueError("No files to build a cube from")
+
+        if timestamps is None:
+            file_timestamps = sorted(
+                ((f, ThermalDataHandler.extract_datetime_from_filename(f)) for f in files),
+                key=lambda ft: ft[1])
+            files = [ft[0] for ft in file_timestamps]
+            timestamps = [ft[1] for ft in file_timestamps]
+
+        if path is None:
+            path = cls.default_path(files, camera_type)
+
+        if storage is None:
+            storage = config.FRAME_STORAGE
+
+        # The first frame fixes the frame size of the cube (and the fixed-point offset)
+        first_frame = ThermalDataHandler.load_csv_data(files[0], camera_type)
+        shape = (len(files),) + first_frame.shape
+        codec = None
+        if storage == "fixed":
+            codec = FixedPointCodec.for_data(first_frame, scale=config.FIXED_POINT_SCALE)
+            dtype = np.int16
+
+        # Build into a temporary directory so a half-written cube is never opened
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        try:
+            frames = np.memmap(os.path.join(tmp_path, FRAMES_NAME), dtype=dtype, mode='w+', shape=shape)
+            frame_metadata = [None] * len(files)
+            frames[0] = codec.encode(first_frame) if codec else first_frame
+            frame_metadata[0] = summarize_frame(first_frame)
+
+            def store_frame(index, result):
+                data, summary = result
+                if data.shape != shape[1:]:
+                    raise ValueError(f"Frame size {data.shape} of {os.path.basename(files[index + 1])} "
+                                     f"does not match {shape[1:]}")
+                frames[index + 1] = codec.encode(data) if codec else data
+                frame_metadata[index + 1] = summary
+
+            def report_progress(completed, total):
+                if progress_callback is not None:
+                    progress_callback(completed + 1, total + 1)
+
+            ingest_files(files[1:], camera_type, with_summaries=True, max_workers=max_workers,
+                         on_result=store_frame, progress_callback=report_progress,
+                         cancel_event=cancel_event)
+            frames.flush()
+            del frames
+
+            HistogramIndex.from_summaries(frame_metadata).save(os.path.join(tmp_path, HISTOGRAMS_NAME))
+            
+            manifest = {
+                'version': CUBE_FORMAT_VERSION,
+                'camera_type': camera_type.name,
+                'dtype': np.dtype(dtype).str,
+                'shape': list(shape),
+                'codec': codec.to_dict() if codec else None,
+                'timestamps': [ts.isoformat() for ts in timestamps],
+                'files': cls._file_entries(files),
+                'frame_metadata': [cls._metadata_entry(meta) for meta in frame_metadata]
+            }
+            with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+                json.dump(manifest, f)
+
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        return cls.open(path)
+
+    @classmethod
+    def open_or_build(cls, files, camera_type, path=None, **kwargs):
+        """
+        Open the cube for a file set if it is up to date, otherwise (re)build it.
+
+        Reopening an unchanged dataset only costs one stat() per file.
+        Keyword arguments are passed to ThermalCube.build.
+        """
+        if path is None:
+            path = cls.default_path(files, camera_type)
+        try:
+            cube = cls.open(path)
+            if cube.is_current(files, camera_type, kwargs.get('storage')):
+                return cube
+            cube.close()
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls.build(files, camera_type, path=path, **kwargs)
@@ -1,9 +1,13 @@
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
 import re
+import threading
+import warnings
+from collections import deque
 from utils.camera_types import CameraType
+from utils.config import config
+from thermal_cache import disk_frame_cache
 
 class ThermalDataHandler:
     @staticmethod
@@ -21,31 +25,9 @@ class ThermalDataHandler:
             
             # If it's a FLIR file, try to get datetime from metadata
             if camera_type == CameraType.FLIR:
-                with open(filepath, 'r') as file:
-                    for _ in range(2):  # Skip first two lines
-                        next(file)
-                    time_line = next(file).strip()  # Third line should contain time info
-                    
-                    # Check if the line contains time information
-                    time_match = re.search(r'Time\s*=\s*(\d+):(\d+):(\d+):(\d+)\.(\d+)', time_line)
-                    if time_match:
-                        # Extract components - format is typically ddd:hh:mm:ss.microsec
-                        days, hours, minutes, seconds, microsec = time_match.groups()
-                        
-                        # Get the base date as a starting point
-                        year = datetime.now().year
-                        # Create datetime for January 1st of the given year at 00:00:00.000
-                        base_date = datetime(year, 1, 1)
-                        # Add the day of year (subtract 1 because day_of_year is 1-based)
-                        date_from_day = base_date + timedelta(days=int(days) - 1)
-                    
-                        # Set the time components
-                    return date_from_day.replace(
-                        hour=int(hours),
-                        minute=int(minutes),
-                        second=int(seconds),
-                        microsecond=0
-                        )
+                metadata = ThermalDataHandler.read_flir_header(filepath)
+                if metadata.get('timestamp') is not None:
+                    return metadata['timestamp']
         except Exception as e:
             print(f"Error extracting datetime from FLIR metadata: {e}")
         
@@ -95,19 +77,37 @@ class ThermalDataHandler:
     def _get_mobotix_dimensions(filepath):
         """Extract image dimensions from Mobotix CSV metadata."""
         with open(filepath, 'r') as file:
-            metadata = [next(file).strip() for _ in range(8)]
-        
-        width = height = None
-        for line in metadata:
-            if 'width;' in line:
-                width = int(line.split(';')[1])
-            elif 'height;' in line:
-                height = int(line.split(';')[1])
-                
-        if width is None or height is None:
+            header = [file.readline() for _ in range(config.METADATA_ROWS)]
+        
+        metadata = ThermalDataHandler._parse_mobotix_metadata(header)
+        if 'width' not in metadata or 'height' not in metadata:
             raise ValueError("Could not find width and height in Mobotix metadata")
             
-        return width, height
+        return metadata['width'], metadata['height']
+
+    @staticmethod
+    def _parse_mobotix_metadata(header_lines):
+        """
+        Parse the "key;value" lines of a Mobotix metadata block.
+        
+        Keys are lower-cased with spaces replaced by underscores. Width, height
+        and bit depth are converted to integers.
+        """
+        metadata = {}
+        for line in header_lines:
+            if ';' not in line:
+                continue
+            key, value = line.strip().split(';', 1)
+            key = key.strip().lower().replace(' ', '_')
+            value = value.strip()
+            
+            if key in ('width', 'height'):
+                value = int(value)
+            elif key == 'bit_depth':
+                bits = re.match(r'(\d+)', value)
+                value = int(bits.group(1)) if bits else value
+            metadata[key] = value
+        return metadata
 
     @staticmethod
     def _get_flir_dimensions(filepath):
@@ -134,11 +134,86 @@ class ThermalDataHandler:
         return columns, rows
 
     @staticmethod
-    def load_csv_data(filepath, camera_type=None):
-        """Load and process thermal data from CSV file based on camera type."""
+    def load_csv_data(filepath, camera_type=None, use_cache=True, decode=True):
+        """
+        Load and process thermal data from CSV file based on camera type.
+        Parsed frames are served from the on-disk frame cache when available.
+        With decode=False, frames the cache stores in fixed point are returned
+        as their int16 encoding (see DiskFrameCache.load).
+        """
         if camera_type is None:
             camera_type = ThermalDataHandler.detect_camera_type(filepath)
-            
+        
+        if use_cache:
+            data = disk_frame_cache.load(filepath, camera_type, decode)
+            if data is not None:
+                return data
+        
+        data = ThermalDataHandler._parse_csv_data(filepath, camera_type)
+        
+        if use_cache:
+            # Returns the frame as cached, e.g. rounded to fixed-point
+            data = disk_frame_cache.store(filepath, camera_type, data, decode)
+        return data
+
+    @staticmethod
+    def iter_frames(paths, camera_type=None, batch_size=None, dtype=None, timestamps=None,
+                    sort=True, max_memory_mb=None, skip_errors=False):
+        """
+        Stream the frames of a set of files in timestamp order.
+        
+        Files are parsed ahead of the caller on a worker thread. Frames read
+        ahead, plus the item the caller is currently working on, never take
+        more than `max_memory_mb` (at least one item is always read), so the
+        whole dataset can be reduced in one pass whatever its size. Frames the
+        caller keeps references to are not counted.
+        
+        Parameters:
+            paths (list): CSV file paths
+            camera_type (CameraType): Camera type, detected per file if None
+            batch_size (int): Yield stacked batches of this many frames
+                instead of single frames. The last batch may be shorter.
+            dtype: Convert frames to this dtype, e.g. np.float32 to halve memory
+            timestamps (list): Timestamps of the files. If None, they are
+                taken from the dataset catalog when sorting, and yielded as
+                None otherwise.
+            sort (bool): Sort the files by timestamp. Pass False for files
+                that are already in time order.
+            max_memory_mb (float): Read-ahead memory cap, defaults to
+                config.STREAM_MEMORY_MB
+            skip_errors (bool): Report files that cannot be read and yield a
+                NaN frame in their place, instead of raising
+        
+        Yields:
+            tuple: (timestamp, frame), or (timestamps, (n, height, width)
+                array) if batch_size is given
+        
+        Raises:
+            ValueError: If frames of one batch differ in shape
+        """
+        paths = list(paths)
+        if timestamps is None and not sort:
+            # The files are not looked up only to stream them in the given order
+            timestamps = [None] * len(paths)
+        elif timestamps is None:
+            # Imported here as the catalog itself depends on this module
+            from thermal_catalog import get_catalog_entries
+            timestamps = [entry['timestamp'] for entry in get_catalog_entries(paths)]
+        timestamps = list(timestamps)
+        if sort:
+            order = sorted(range(len(paths)), key=lambda i: (timestamps[i] is None, timestamps[i] or 0))
+            paths = [paths[i] for i in order]
+            timestamps = [timestamps[i] for i in order]
+        
+        if max_memory_mb is None:
+            max_memory_mb = config.STREAM_MEMORY_MB
+        reader = _FrameReader(paths, timestamps, camera_type, batch_size, dtype,
+                              int(max_memory_mb * 1024 * 1024), skip_errors)
+        yield from reader
+
+    @staticmethod
+    def _parse_csv_data(filepath, camera_type):
+        """Parse thermal data from CSV file based on camera type."""
         if camera_type == CameraType.MOBOTIX:
             return ThermalDataHandler._load_mobotix_data(filepath)
         elif camera_type == CameraType.FLIR:
@@ -149,78 +224,296 @@ class ThermalDataHandler:
     @staticmethod
     def _load_mobotix_data(filepath):
         """Load and process thermal data from Mobotix CSV file."""
-        # Get dimensions from metadata
-        width, height = ThermalDataHandler._get_mobotix_dimensions(filepath)
+        thermal_data, _ = ThermalDataHandler.read_mobotix_file(filepath)
+        return thermal_data
+
+    @staticmethod
+    def read_mobotix_file(filepath):
+        """
+        Read a Mobotix CSV file in a single pass.
         
-        # Skip the first 8 rows (metadata) and read the thermal data
-        data = pd.read_csv(filepath, skiprows=8, sep=';', header=None, decimal='.')
+        The metadata block and the semicolon separated grid are read from one
+        open file, and each row is parsed straight into a preallocated
+        (height, width) array.
         
-        # Flatten all columns into a single array and reshape
-        thermal_data = data.values.flatten()
+        Returns:
+            tuple: (thermal_data, metadata) where metadata is a dict with the
+                header values ('sensor', 'bit_depth', 'width', 'height',
+                'resolution', 'unit', ...)
+        """
+        with open(filepath, 'r') as file:
+            header = [file.readline() for _ in range(config.METADATA_ROWS)]
+            metadata = ThermalDataHandler._parse_mobotix_metadata(header)
+            if 'width' not in metadata or 'height' not in metadata:
+                raise ValueError("Could not find width and height in Mobotix metadata")
+            width, height = metadata['width'], metadata['height']
+            
+            thermal_data = np.empty((height, width))
+            row = 0
+            with warnings.catch_warnings():
+                # np.fromstring warns (instead of raising) on malformed rows
+                warnings.simplefilter('ignore', DeprecationWarning)
+                for line in file:
+                    if not line.strip():
+                        continue
+                    if row >= height:
+                        raise ValueError(f"Mobotix file has more than {height} data rows")
+                    
+                    values = np.fromstring(line.replace(';', ' '), sep=' ')
+                    if values.size != width:
+                        # Rows with empty cells need the slower, explicit split
+                        values = ThermalDataHandler._parse_row_with_gaps(line, ';', width)
+                    thermal_data[row] = values
+                    row += 1
         
-        # Reshape the data into a 2D array using the actual dimensions
-        return thermal_data.reshape(height, width)
+        if row != height:
+            raise ValueError(f"Expected {height} data rows in Mobotix file, found {row}")
+            
+        return thermal_data, metadata
+
+    @staticmethod
+    def _parse_row_with_gaps(line, sep, width):
+        """Parse a delimited row, reading empty cells as NaN."""
+        values = line.strip().rstrip(sep).split(sep)
+        if len(values) != width:
+            raise ValueError(f"Expected {width} values per row, found {len(values)}")
+        return np.array([value if value.strip() else 'nan' for value in values], dtype=float)
 
     @staticmethod
     def _load_flir_data(filepath):
         """Load and process thermal data from FLIR CSV file."""
-        # Get dimensions by counting rows and columns
-        width, height = ThermalDataHandler._get_flir_dimensions(filepath)
+        thermal_data, _ = ThermalDataHandler.read_flir_file(filepath)
+        return thermal_data
+
+    @staticmethod
+    def read_flir_file(filepath):
+        """
+        Read a FLIR CSV file in a single pass.
+        
+        The "Key = Value" header, the image dimensions and the comma separated
+        values (scientific notation) are all taken from one read of the file,
+        and the values are converted to floats in one bulk operation.
         
-        # Find the header size by counting lines until we find the first data row
-        header_size = 0
+        Returns:
+            tuple: (thermal_data, metadata) where metadata is a dict with the
+                header values ('filename', 'units', 'time', 'framenumber',
+                'preset', ...), the parsed 'timestamp' and 'width'/'height'
+        """
         with open(filepath, 'r') as file:
-            for line in file:
-                if ',' in line:
-                    break
-                header_size += 1
+            header, first_row = ThermalDataHandler._read_flir_header_lines(file)
+            if not first_row:
+                raise ValueError("Could not find any data rows in FLIR file")
+            body = first_row + file.read()
+        
+        metadata = ThermalDataHandler._parse_flir_metadata(header)
+        width = len(first_row.strip().rstrip(',').split(','))
+        
+        with warnings.catch_warnings():
+            # np.fromstring warns (instead of raising) on malformed values
+            warnings.simplefilter('ignore', DeprecationWarning)
+            values = np.fromstring(body.replace(',', ' '), sep=' ')
         
-        # Skip the header rows and read the thermal data
-        # FLIR data uses comma separator and is in scientific notation
+        if values.size % width == 0:
+            thermal_data = values.reshape(-1, width)
+        else:
+            # Ragged or incomplete rows: parse row by row, reading gaps as NaN
+            rows = [line for line in body.splitlines() if ',' in line]
+            thermal_data = np.empty((len(rows), width))
+            for i, line in enumerate(rows):
+                thermal_data[i] = ThermalDataHandler._parse_row_with_gaps(line, ',', width)
+        
+        metadata['width'], metadata['height'] = width, thermal_data.shape[0]
+        return thermal_data, metadata
+
+    @staticmethod
+    def read_flir_header(filepath):
+        """Read only the metadata block of a FLIR CSV file."""
+        with open(filepath, 'r') as file:
+            header, _ = ThermalDataHandler._read_flir_header_lines(file)
+        return ThermalDataHandler._parse_flir_metadata(header)
+
+    @staticmethod
+    def _read_flir_header_lines(file):
+        """
+        Read header lines up to the first data row (the first line containing a comma).
+        
+        Returns:
+            tuple: (header_lines, first_data_row), first_data_row is '' if the file has no data
+        """
+        header = []
+        line = file.readline()
+        while line and ',' not in line:
+            header.append(line)
+            line = file.readline()
+        return header, line
+
+    @staticmethod
+    def _parse_flir_metadata(header_lines):
+        """
+        Parse the "Key = Value" lines of a FLIR metadata block.
+        
+        Keys are lower-cased with spaces replaced by underscores. The "Time"
+        value is also converted to a datetime and stored as 'timestamp'.
+        """
+        metadata = {}
+        for line in header_lines:
+            if '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            metadata[key.strip().lower().replace(' ', '_')] = value.strip()
+        
+        metadata['timestamp'] = None
+        if 'time' in metadata:
+            metadata['timestamp'] = ThermalDataHandler._parse_flir_time(metadata['time'])
+        return metadata
+
+    @staticmethod
+    def _parse_flir_time(value):
+        """
+        Convert a FLIR "ddd:hh:mm:ss.microsec" time value to a datetime.
+        
+        FLIR only stores the day of year, so the current year is assumed.
+        """
+        time_match = re.match(r'(\d+):(\d+):(\d+):(\d+)(?:\.(\d+))?', value)
+        if not time_match:
+            return None
+        
+        days, hours, minutes, seconds, _ = time_match.groups()
+        # Add the day of year to January 1st (subtract 1 because day_of_year is 1-based)
+        base_date = datetime(datetime.now().year, 1, 1)
+        date_from_day = base_date + timedelta(days=int(days) - 1)
+        return date_from_day.replace(
+            hour=int(hours),
+            minute=int(minutes),
+            second=int(seconds),
+            microsecond=0
+            )
+
+
+class _FrameReader:
+    """
+    Read-ahead worker behind ThermalDataHandler.iter_frames.
+    
+    The worker thread reserves memory for an item before reading it, using
+    the size of the previous item, and waits while the queued items and the
+    item held by the consumer would exceed the budget.
+    """
+    
+    def __init__(self, paths, timestamps, camera_type, batch_size, dtype, max_bytes, skip_errors):
+        self.paths = paths
+        self.timestamps = timestamps
+        self.camera_type = camera_type
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self.max_bytes = max_bytes
+        self.skip_errors = skip_errors
+        self._items = deque()  # (item, nbytes) ready for the consumer
+        self._resident = 0  # Bytes queued, reserved or held by the consumer
+        self._done = False
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+    
+    def __iter__(self):
+        """Yield the items read by the worker thread, stopping it when closed early."""
+        threading.Thread(target=self._run, daemon=True).start()
+        held = 0
         try:
-            data = pd.read_csv(filepath, skiprows=header_size, header=None, sep=',')
-            
-            # Convert from scientific notation and handle any potential errors
-            thermal_data = data.values.astype(float)
-            
-            # Reshape if necessary to ensure correct dimensions
-            if thermal_data.shape != (height, width):
-                thermal_data = thermal_data.flatten()
-                # Remove any NaN values that might be at the end of rows
-                thermal_data = thermal_data[~np.isnan(thermal_data)]
-                # Reshape to the expected dimensions
-                thermal_data = thermal_data[:height*width].reshape(height, width)
-                
-            return thermal_data
-            
-        except Exception as e:
-            # Fallback method if pandas approach fails
-            print(f"Error reading FLIR data with pandas: {e}")
-            print("Using alternative parsing method...")
-            
-            # Manual parsing as fallback
-            thermal_data = np.zeros((height, width))
-            with open(filepath, 'r') as file:
-                # Skip header rows
-                for _ in range(header_size):
-                    next(file)
-                
-                # Read data rows
-                for i, line in enumerate(file):
-                    if i >= height:
+            while True:
+                with self._condition:
+                    # The previous item is released once the consumer asks for the next one
+                    self._resident -= held
+                    held = 0
+                    self._condition.notify_all()
+                    self._condition.wait_for(lambda: self._items or self._done)
+                    if not self._items:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    item, held = self._items.popleft()
+                yield item
+        finally:
+            with self._condition:
+                self._closed = True
+                self._items.clear()
+                self._condition.notify_all()
+    
+    def _run(self):
+        """Read items until all files are read or the consumer stops."""
+        try:
+            frames = self._loaded_frames()
+            reserved = 0
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._closed or self._resident == 0
+                                             or self._resident + reserved <= self.max_bytes)
+                    if self._closed:
+                        return
+                    self._resident += reserved
+                item, nbytes = self._next_item(frames)
+                with self._condition:
+                    self._resident += nbytes - reserved
+                    if item is None:
                         break
-                        
-                    if ',' not in line:
-                        continue  # Skip non-data lines
-                        
-                    # Split line by comma and convert values to float
-                    values = line.strip().rstrip(',\r').split(',')
-                    row_data = [float(val) for val in values[:width] if val.strip()]
-                    
-                    # Pad row with zeros if needed
-                    if len(row_data) < width:
-                        row_data.extend([0] * (width - len(row_data)))
-                        
-                    thermal_data[i, :len(row_data)] = row_data
-                    
-            return thermal_data
\ No newline at end of file
+                    self._items.append((item, nbytes))
+                    self._condition.notify_all()
+                reserved = nbytes
+        except Exception as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+    
+    def _loaded_frames(self):
+        """Yield (timestamp, frame) for every file, in order."""
+        shape = None
+        failed = []  # Timestamps of unreadable files before the frame shape is known
+        for path, timestamp in zip(self.paths, self.timestamps):
+            if self._closed:
+                return
+            try:
+                data = ThermalDataHandler.load_csv_data(path, self.camera_type)
+            except Exception as e:
+                if not self.skip_errors:
+                    raise
+                print(f"Error processing file {path}: {e}")
+                if shape is None:
+                    failed.append(timestamp)
+                    continue
+                data = np.full(shape, np.nan)
+            if self.dtype is not None:
+                data = data.astype(self.dtype, copy=False)
+            if shape is None:
+                shape = data.shape
+                for failed_timestamp in failed:
+                    yield failed_timestamp, np.full(shape, np.nan, dtype=data.dtype)
+            yield timestamp, data
+    
+    def _next_item(self, frames):
+        """
+        Read the next single frame or batch.
+        
+        Returns:
+            tuple: (item, nbytes), item is None at the end of the files
+        """
+        if self.batch_size is None:
+            item = next(frames, None)
+            return item, (item[1].nbytes if item is not None else 0)
+        
+        timestamps = []
+        batch = None
+        for timestamp, data in frames:
+            if batch is None:
+                batch = np.empty((self.batch_size,) + data.shape, dtype=data.dtype)
+            elif data.shape != batch.shape[1:]:
+                raise ValueError(f"Frame of {timestamp} has shape {data.shape}, "
+                                 f"expected {batch.shape[1:]}")
+            batch[len(timestamps)] = data
+            timestamps.append(timestamp)
+            if len(timestamps) == self.batch_size:
+                break
+        if batch is None:
+            return None, 0
+        return (timestamps, batch[:len(timestamps)]), batch.nbytes
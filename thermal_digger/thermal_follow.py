@@ -0,0 +1,78 @@
+"""
+Detection of new frames written to a directory by a live camera.
+
+The directory is polled rather than watched with OS notifications, which
+behave differently per platform and on network shares. A new file is only
+reported once its size and modification time have stayed the same between
+two polls, so files that are still being written are never parsed.
+"""
+
+import os
+from utils.config import config
+
+
+class DirectoryWatcher:
+    """Polls a directory for new thermal CSV files that have finished being written."""
+
+    def __init__(self, directory, known_files=()):
+        """
+        Initialize the watcher.
+
+        Parameters:
+            directory (str): Directory to watch
+            known_files (list): Files already loaded, which are never reported
+        """
+        self.directory = os.path.abspath(directory)
+        self.known = {os.path.abspath(f) for f in known_files}
+        self._pending = {}  # Path -> (size, mtime_ns) at the previous poll
+        self._failures = {}  # Path -> number of times the file failed to load
+
+    def poll(self):
+        """
+        Check the directory once.
+
+        Returns:
+            list: Paths of new files that were unchanged since the previous
+                poll, sorted by name
+        """
+        seen = {}
+        with os.scandir(self.directory) as scan:
+            for dir_entry in scan:
+                if not dir_entry.name.lower().endswith(config.SUPPORTED_EXTENSIONS):
+                    continue
+                path = os.path.abspath(dir_entry.path)
+                if path in self.known or not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+                seen[path] = (stat.st_size, stat.st_mtime_ns)
+
+        ready = sorted(path for path, signature in seen.items()
+                       if signature[0] > 0 and self._pending.get(path) == signature)
+        self.known.update(ready)
+        self._pending = {path: signature for path, signature in seen.items() if path not in self.known}
+        return ready
+
+    def forget(self, paths, max_attempts=None):
+        """
+        Report files that failed to load again once they are unchanged between two polls.
+
+        A file that failed max_attempts times is not reported any more.
+
+        Parameters:
+            paths (list): Files that failed to load
+            max_attempts (int): Defaults to config.FOLLOW_MAX_ATTEMPTS
+
+        Returns:
+            list: The files given up on
+        """
+        if max_attempts is None:
+            max_attempts = config.FOLLOW_MAX_ATTEMPTS
+        given_up = []
+        for path in paths:
+            path = os.path.abspath(path)
+            self._failures[path] = self._failures.get(path, 0) + 1
+            if self._failures[path] < max_attempts:
+                self.known.discard(path)
+            else:
+                given_up.append(path)
+        return given_up
@@ -0,0 +1,163 @@
+"""
+Parallel ingest of thermal CSV files.
+
+Parsing is CPU-bound and independent per file, so files are parsed on a
+process pool and results are collected as they complete.
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from thermal_data import ThermalDataHandler
+from thermal_stats import frame_histogram
+from utils.config import config
+
+
+class IngestError(Exception):
+    """Raised when a file cannot be parsed during ingest."""
+
+    def __init__(self, filepath, error):
+        super().__init__(f"{os.path.basename(filepath)}: {error}")
+        self.filepath = filepath
+        self.error = error
+
+
+class IngestCancelled(Exception):
+    """Raised when an ingest is cancelled through its cancel event."""
+
+
+def summarize_frame(data):
+    """
+    Compute the per-frame summary used for display ranges and dataset info.
+
+    Returns:
+        dict: 'shape', 'min', 'max' and 'mean' of the frame, and its
+            'histogram' (see thermal_stats.frame_histogram)
+    """
+    with warnings.catch_warnings():
+        # All-NaN frames legitimately give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            'shape': data.shape,
+            'min': float(np.nanmin(data)),
+            'max': float(np.nanmax(data)),
+            'mean': float(np.nanmean(data)),
+            'histogram': frame_histogram(data)
+        }
+
+
+def _load_frame_task(filepath, camera_type):
+    """Worker task: parse one file and return the frame."""
+    return ThermalDataHandler.load_csv_data(filepath, camera_type)
+
+
+def _summarize_frame_task(filepath, camera_type):
+    """Worker task: parse one file and return only its summary."""
+    return summarize_frame(ThermalDataHandler.load_csv_data(filepath, camera_type))
+
+
+def _load_frame_with_summary_task(filepath, camera_type):
+    """Worker task: parse one file and return (frame, summary)."""
+    data = ThermalDataHandler.load_csv_data(filepath, camera_type)
+    return data, summarize_frame(data)
+
+
+def get_worker_count(n_files, max_workers=None):
+    """Resolve the number of worker processes for a given number of files."""
+    if max_workers is None:
+        max_workers = config.INGEST_WORKERS
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    return max(1, min(max_workers, n_files))
+
+
+def ingest_files(files, camera_type, summaries_only=False, with_summaries=False,
+                 max_workers=None, on_result=None, on_error=None, progress_callback=None,
+                 cancel_event=None):
+    """
+    Parse thermal CSV files on a process pool.
+
+    Parameters:
+        files (list): CSV file paths
+        camera_type (CameraType): Camera type of the files
+        summaries_only (bool): If True, workers return frame summaries
+            (see summarize_frame) instead of full frames
+        with_summaries (bool): If True, workers return (frame, summary) tuples
+        max_workers (int): Number of worker processes. Defaults to
+            config.INGEST_WORKERS (0 = one per CPU)
+        on_result (callable): Called as on_result(index, result) as soon as a
+            file completes. When given, results are not accumulated.
+        on_error (callable): Called as on_error(index, IngestError) when a
+            file fails to parse. When given, the file is skipped (its result
+            is None and on_result is not called for it) instead of raising.
+        progress_callback (callable): Called as progress_callback(completed, total)
+            from the calling thread after each completed file
+        cancel_event (threading.Event): Checked after each completed file;
+            once set, pending files are cancelled
+
+    Returns:
+        list: Results in input order, or None if on_result is given
+
+    Raises:
+        IngestError: If a file fails to parse and on_error is not given.
+            Pending files are cancelled.
+        IngestCancelled: If cancel_event is set before all files completed
+    """
+    if summaries_only:
+        task = _summarize_frame_task
+    elif with_summaries:
+        task = _load_frame_with_summary_task
+    else:
+        task = _load_frame_task
+    total = len(files)
+    results = [None] * total if on_result is None else None
+
+    def handle_result(index, result, completed):
+        if cancel_event is not None and cancel_event.is_set():
+            raise IngestCancelled()
+        if on_result is not None:
+            on_result(index, result)
+        else:
+            results[index] = result
+        if progress_callback is not None:
+            progress_callback(completed, total)
+
+    def handle_error(index, error, completed):
+        if on_error is None:
+            raise IngestError(files[index], error) from error
+        on_error(index, IngestError(files[index], error))
+        if cancel_event is not None and cancel_event.is_set():
+            raise IngestCancelled()
+        if progress_callback is not None:
+            progress_callback(completed, total)
+
+    workers = get_worker_count(total, max_workers)
+
+    # A pool only pays off with more than one worker
+    if workers == 1:
+        for index, filepath in enumerate(files):
+            try:
+                result = task(filepath, camera_type)
+            except Exception as e:
+                handle_error(index, e, index + 1)
+                continue
+            handle_result(index, result, index + 1)
+        return results
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(task, filepath, camera_type): index
+                   for index, filepath in enumerate(files)}
+        for completed, future in enumerate(as_completed(futures), 1):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                handle_error(index, e, completed)
+                continue
+            handle_result(index, result, completed)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return results
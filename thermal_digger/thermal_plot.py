@@ -6,16 +6,133 @@ from plotly.subplots import make_subplots
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.patches import Polygon
-from matplotlib.path import Path
+import matplotlib.dates as mdates
 import tkinter as tk
 from tkinter import ttk
 from utils.config import config
+from thermal_series import get_polygon_mask, get_statistic_label
+from utils.downsample import downsample_indices, minmax_indices
 import matplotlib.colors as mcolors
 import os
+import json
+import base64
+import shutil
+import atexit
+import tempfile
 import webbrowser
 from plotly.offline import plot
 from plotly.io import to_html
 
+# Line colors of the polygon statistics, other percentiles use gray
+STATISTIC_COLORS = {
+    'mean': 'green',
+    'min': 'blue',
+    'max': 'red',
+    'median': 'purple',
+    'p5': 'cornflowerblue',
+    'p95': 'orange'
+}
+
+# Markers of the time series panel are drawn once the visible samples are at least this many pixels apart
+TIMESERIES_MARKER_SPACING = 8
+
+# Traces of interactive plots drawing more samples than this are shown without markers
+INTERACTIVE_MARKER_LIMIT = 1000
+
+HOVER_TEMPLATE = '<b>%{fullData.name}</b><br>Time: %{x|%Y-%m-%d %H:%M:%S}<br>Temperature: %{y:.2f}°C<extra></extra>'
+
+# Redraws the decimated traces of an interactive plot from the full-resolution
+# samples embedded in the page whenever the time axis is zoomed or panned, with
+# the same decimation as utils.downsample. __DATA__ is replaced by the samples
+# and Plotly replaces {plot_id} by the id of the plot.
+ZOOM_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var data = __DATA__;
+function decode(text, Type) {
+    var raw = atob(text), bytes = new Uint8Array(raw.length);
+    for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    return new Type(bytes.buffer);
+}
+var x = decode(data.x, Float64Array);
+var ys = data.y.map(function (text) { return decode(text, Float32Array); });
+var n = x.length;
+function bound(value) {
+    var lo = 0, hi = n;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (x[mid] < value) lo = mid + 1; else hi = mid; }
+    return lo;
+}
+function minmax(y, lo, hi, keep) {
+    var nb = Math.max(data.maxPoints >> 1, 1), x0 = x[lo], span = x[hi - 1] - x0;
+    var minI = new Int32Array(nb).fill(-1), maxI = new Int32Array(nb).fill(-1), nanI = new Int32Array(nb).fill(-1);
+    for (var i = lo; i < hi; i++) {
+        var b = span > 0 ? Math.min(Math.floor((x[i] - x0) * nb / span), nb - 1) : Math.floor((i - lo) * nb / (hi - lo));
+        var v = y[i];
+        if (v !== v) { if (nanI[b] < 0) nanI[b] = i; continue; }
+        if (minI[b] < 0 || v < y[minI[b]]) minI[b] = i;
+        if (maxI[b] < 0 || v > y[maxI[b]]) maxI[b] = i;
+    }
+    for (var b = 0; b < nb; b++) {
+        if (minI[b] >= 0) { keep[minI[b] - lo] = 1; keep[maxI[b] - lo] = 1; }
+        else if (nanI[b] >= 0) keep[nanI[b] - lo] = 1;
+    }
+}
+function lttb(y, lo, hi, keep) {
+    var valid = [];
+    for (var i = lo; i < hi; i++) if (y[i] === y[i]) valid.push(i);
+    var m = valid.length, out = Math.max(data.maxPoints, 3);
+    if (m <= out) { valid.forEach(function (i) { keep[i - lo] = 1; }); return; }
+    var every = (m - 2) / (out - 2), a = 0;
+    function edge(k) { return k === out - 2 ? m - 1 : Math.floor(k * every) + 1; }
+    keep[valid[0] - lo] = 1; keep[valid[m - 1] - lo] = 1;
+    for (var k = 0; k < out - 2; k++) {
+        var start = edge(k), stop = edge(k + 1), next = stop, nextStop = k === out - 3 ? m : edge(k + 2);
+        var avgX = 0, avgY = 0;
+        for (var j = next; j < nextStop; j++) { avgX += x[valid[j]]; avgY += y[valid[j]]; }
+        avgX /= nextStop - next; avgY /= nextStop - next;
+        var ax = x[valid[a]], ay = y[valid[a]], best = start, bestArea = -1;
+        for (var j = start; j < stop; j++) {
+            var area = Math.abs((ax - avgX) * (y[valid[j]] - ay) - (ax - x[valid[j]]) * (avgY - ay));
+            if (area > bestArea) { bestArea = area; best = j; }
+        }
+        keep[valid[best] - lo] = 1;
+        a = best;
+    }
+}
+function update(x0, x1) {
+    // One more sample on each side, so the lines reach the edges of the plot
+    var lo = Math.max(bound(x0) - 1, 0), hi = Math.min(bound(x1) + 1, n);
+    if (hi - lo < 2) return;
+    var traces = [], xs = [], values = [], modes = [];
+    data.groups.forEach(function (group) {
+        var keep = new Uint8Array(hi - lo);
+        if (hi - lo <= data.maxPoints) keep.fill(1);
+        else group.forEach(function (t) { (data.method === 'lttb' ? lttb : minmax)(ys[t], lo, hi, keep); });
+        keep[0] = 1; keep[hi - lo - 1] = 1;
+        var idx = [];
+        for (var i = 0; i < keep.length; i++) if (keep[i]) idx.push(lo + i);
+        var groupX = idx.map(function (i) { return x[i]; });
+        group.forEach(function (t) {
+            traces.push(t);
+            xs.push(groupX);
+            values.push(idx.map(function (i) { var v = ys[t][i]; return v === v ? v : null; }));
+            modes.push(data.markers[t] && idx.length <= data.markerLimit ? 'lines+markers' : 'lines');
+        });
+    });
+    Plotly.restyle(gd, {x: xs, y: values, mode: modes}, traces);
+}
+function toMs(value) {
+    if (typeof value === 'number') return value;
+    var text = String(value).slice(0, 23);
+    if (text.length <= 10) text += ' 00:00';
+    return Date.parse(text.replace(' ', 'T') + 'Z');
+}
+gd.on('plotly_relayout', function (event) {
+    if (event['xaxis.range[0]'] !== undefined) update(toMs(event['xaxis.range[0]']), toMs(event['xaxis.range[1]']));
+    else if (event['xaxis.range'] !== undefined) update(toMs(event['xaxis.range'][0]), toMs(event['xaxis.range'][1]));
+    else if (event['xaxis.autorange']) update(x[0], x[n - 1]);
+});
+"""
+
 
 class ThermalPlotter:
     def __init__(self, plot_frame):
@@ -27,6 +144,10 @@ class ThermalPlotter:
         self.ax_timeseries = None
         self.canvas_timeseries = None
         self.polygon_patch = None
+        self.thermal_image = None  # AxesImage of the displayed frame, reused across frames
+        self.colorbar = None
+        self.thermal_background = None  # Canvas without the frame image, for blitting
+        self.overlay_background = None  # Canvas with the frame image but without the selections
         
         # Store multiple points with their colors
         self.points = []  # List of (x, y, color) tuples
@@ -36,19 +157,26 @@ class ThermalPlotter:
         self.colors = list(mcolors.TABLEAU_COLORS.values())
         self.current_color_idx = 0
         
+        # Full-resolution series of the time series panel, drawn decimated to the visible range
+        self.timeseries_x = None  # datetime64 timestamps
+        self.timeseries_x_num = None  # The same as Matplotlib date numbers
+        self.timeseries_lines = []  # (line, values, marker) of each series
+        self.timeseries_band = None  # Mean ± std band of polygon statistics
+        self.timeseries_view = None  # (first, stop, width in pixels) of the drawn samples
+        
         # Store time series data for CSV export
         self.current_timeseries_data = {
             'timestamps': None,
             'values': {},  # Dictionary mapping point index to values
-            'mins': None,
-            'maxs': None,
+            'statistics': None,  # Columnar table of polygon statistics
             'selection_type': None
         }
 
-        # Create temp directory for plot files if it doesn't exist
-        self.temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
-        if not os.path.exists(self.temp_dir):
-            os.makedirs(self.temp_dir)
+        # The interactive plot is only written when it is opened, to a
+        # per-session temp directory created on first use
+        self.temp_dir = None
+        self.series_version = 0  # Incremented whenever the plotted series change
+        self.interactive_plot = None  # (series version, HTML path) of the last written plot
         
         self.setup_plots()
 
@@ -58,6 +186,7 @@ class ThermalPlotter:
         self.fig_thermal = Figure(figsize=(10, 8), constrained_layout=True)
         self.ax_thermal = self.fig_thermal.add_subplot(111)
         self.canvas_thermal = FigureCanvasTkAgg(self.fig_thermal, master=self.plot_frame)
+        self.canvas_thermal.mpl_connect('draw_event', self._on_thermal_draw)
         self.canvas_thermal.draw()
         canvas_widget = self.canvas_thermal.get_tk_widget()
         canvas_widget.grid(row=0, column=0, padx=5, pady=5, sticky='nsew')
@@ -66,6 +195,7 @@ class ThermalPlotter:
         self.fig_timeseries = Figure(figsize=(10, 4), constrained_layout=True)
         self.ax_timeseries = self.fig_timeseries.add_subplot(111)
         self.canvas_timeseries = FigureCanvasTkAgg(self.fig_timeseries, master=self.plot_frame)
+        self.canvas_timeseries.mpl_connect('resize_event', self._on_timeseries_view_change)
         self.canvas_timeseries.draw()
         self.canvas_timeseries.get_tk_widget().grid(row=1, column=0, padx=5, pady=5, sticky='nsew')
         
@@ -78,24 +208,21 @@ class ThermalPlotter:
         self.ax_thermal.set_position([0.1, 0.1, 0.75, 0.85])  # [left, bottom, width, height]
 
     def plot_thermal_image(self, data, timestamp=None, vmin=None, vmax=None):
-        """Plot thermal image with optional timestamp and fixed colorbar range"""
-        self.ax_thermal.clear()
-        
-        # Maintain consistent axes position
-        self.ax_thermal.set_position([0.1, 0.1, 0.75, 0.85])
-        
-        # Remove old colorbar if it exists
-        if len(self.fig_thermal.axes) > 1:
-            self.fig_thermal.delaxes(self.fig_thermal.axes[1])
-        
-        # Plot image with fixed aspect ratio and colorbar range
-        im = self.ax_thermal.imshow(data, cmap=config.COLORMAP, aspect='equal', 
-                        interpolation='nearest', vmin=vmin, vmax=vmax)
-        
-        # Add colorbar with consistent size
-        cbar = self.fig_thermal.colorbar(im, ax=self.ax_thermal, 
-                                    label='Temperature (°C)',
-                                    pad=0.02)
+        """
+        Plot thermal image with optional timestamp and fixed colorbar range.
+        
+        The image artist and colorbar are created once and reused: changing
+        frames only swaps the pixels and the title and blits them over the
+        cached rest of the figure, so points and polygons drawn on the image
+        stay in place and the axes, ticks and colorbar are not redrawn. The
+        whole figure is only redrawn when the colour range or frame size
+        changes.
+        """
+        # Without a fixed range, scale to this frame as imshow would
+        if vmin is None or vmax is None:
+            with np.errstate(all='ignore'):
+                vmin = np.nanmin(data) if vmin is None else vmin
+                vmax = np.nanmax(data) if vmax is None else vmax
         
         # Create title with timestamp and colorbar range if available
         title = 'Thermal Image'
@@ -104,9 +231,102 @@ class ThermalPlotter:
         # if vmin is not None and vmax is not None:
         #     title = f'{title}\nColorbar Range: {vmin:.2f}°C to {vmax:.2f}°C'
         
+        if self.thermal_image is None or self.thermal_image.get_array().shape != data.shape:
+            self._create_thermal_image(data, vmin, vmax)
+            self.ax_thermal.set_title(title, pad=10)
+            self.canvas_thermal.draw_idle()
+            return
+        
+        self.thermal_image.set_data(data)
         self.ax_thermal.set_title(title, pad=10)
+        if self.thermal_image.get_clim() != (vmin, vmax) or self.thermal_background is None:
+            # The colorbar changes too
+            self.thermal_image.set_clim(vmin, vmax)
+            self.canvas_thermal.draw_idle()
+            return
         
-        self.canvas_thermal.draw()
+        self.canvas_thermal.restore_region(self.thermal_background)
+        self._draw_frame_artists()
+        self.overlay_background = self.canvas_thermal.copy_from_bbox(self.fig_thermal.bbox)
+        self._draw_overlays()
+        self.canvas_thermal.blit(self.fig_thermal.bbox)
+
+    def _create_thermal_image(self, data, vmin, vmax):
+        """Create the image artist and its colorbar, replacing existing ones"""
+        if self.thermal_image is not None:
+            self.thermal_image.remove()
+        if self.colorbar is not None:
+            self.fig_thermal.delaxes(self.colorbar.ax)
+        self.thermal_background = None
+        self.overlay_background = None
+        
+        # Maintain consistent axes position
+        self.ax_thermal.set_position([0.1, 0.1, 0.75, 0.85])
+        
+        # Plot image with fixed aspect ratio and colorbar range
+        self.thermal_image = self.ax_thermal.imshow(
+            data, cmap=config.COLORMAP, aspect='equal', interpolation='nearest', vmin=vmin, vmax=vmax)
+        
+        # Add colorbar with consistent size
+        self.colorbar = self.fig_thermal.colorbar(self.thermal_image, ax=self.ax_thermal, 
+                                                  label='Temperature (°C)',
+                                                  pad=0.02)
+        
+        # The image and the title change with every frame: they are left out of
+        # full redraws and drawn over the cached background instead
+        self.thermal_image.set_animated(True)
+        self.ax_thermal.title.set_animated(True)
+
+    def _on_thermal_draw(self, event):
+        """
+        After a full redraw, cache the backgrounds and draw the frame and the
+        selections on top of them.
+        
+        Two layers are cached: the figure without the frame (restored when the
+        frame changes) and the figure with the frame (restored when only the
+        selections change).
+        """
+        if self.thermal_image is not None and self.thermal_image.get_animated():
+            self.thermal_background = self.canvas_thermal.copy_from_bbox(self.fig_thermal.bbox)
+            self._draw_frame_artists()
+        else:
+            self.thermal_background = None
+        self.overlay_background = self.canvas_thermal.copy_from_bbox(self.fig_thermal.bbox)
+        self._draw_overlays()
+
+    def _draw_frame_artists(self):
+        """Draw the frame image and the title"""
+        self.ax_thermal.draw_artist(self.thermal_image)
+        self.ax_thermal.draw_artist(self.ax_thermal.title)
+
+    def _overlay_artists(self):
+        """Points, lines and polygons drawn over the frame"""
+        ax = self.ax_thermal
+        return [artist for artist in (*ax.lines, *ax.patches, *ax.texts) if artist.get_animated()]
+
+    def _draw_overlays(self):
+        """Draw the selections in z-order"""
+        for artist in sorted(self._overlay_artists(), key=lambda artist: artist.get_zorder()):
+            self.ax_thermal.draw_artist(artist)
+
+    def _add_overlay(self, artist):
+        """Mark a selection artist as part of the blitted overlay layer"""
+        artist.set_animated(True)
+        return artist
+
+    def _update_overlays(self):
+        """
+        Redraw only the selections, over the cached image of the frame.
+        
+        Adding a point or a polygon vertex then costs a few artists instead of
+        a full render of the figure.
+        """
+        if self.overlay_background is None:
+            self.canvas_thermal.draw_idle()
+            return
+        self.canvas_thermal.restore_region(self.overlay_background)
+        self._draw_overlays()
+        self.canvas_thermal.blit(self.fig_thermal.bbox)
 
     def get_next_color(self):
         """Get the next color from the color cycle"""
@@ -122,21 +342,21 @@ class ThermalPlotter:
         # Plot point with simple number label
         point_num = len(self.points)
         # Add the point marker with a plus sign
-        marker = self.ax_thermal.plot(x, y, '+', color=color, markersize=10, linewidth=2)[0]
+        marker = self._add_overlay(self.ax_thermal.plot(x, y, '+', color=color, markersize=10, linewidth=2)[0])
         # Add the point number label
-        text = self.ax_thermal.text(x + 1, y + 1, str(point_num), color=color, 
-                                  fontweight='bold', bbox=dict(facecolor='white', alpha=0.7))
+        text = self._add_overlay(self.ax_thermal.text(x + 1, y + 1, str(point_num), color=color, 
+                                                      fontweight='bold', bbox=dict(facecolor='white', alpha=0.7)))
         
         self.point_markers.extend([marker, text])
-        self.canvas_thermal.draw()
+        self._update_overlays()
         return point_num - 1
 
     def plot_line(self, x1, y1, x2, y2):
         """Plot a line between two points and track it for proper removal"""
-        line = self.ax_thermal.plot([x1, x2], [y1, y2], 'w--')[0]
+        line = self._add_overlay(self.ax_thermal.plot([x1, x2], [y1, y2], 'w--')[0])
         # Add the line to the point_markers list for proper removal later
         self.point_markers.append(line)
-        self.canvas_thermal.draw()
+        self._update_overlays()
 
     def plot_polygon(self, coords):
         """Plot the completed polygon and ensure it can be properly cleared"""
@@ -146,32 +366,54 @@ class ThermalPlotter:
         
         # Create new polygon with white outline
         self.polygon_patch = Polygon(coords, fill=False, color='white', linewidth=2, linestyle='dashed')
-        self.ax_thermal.add_patch(self.polygon_patch)
+        self.ax_thermal.add_patch(self._add_overlay(self.polygon_patch))
         
         # Complete the polygon by connecting last point to first point
         if len(coords) > 2:
             first_x, first_y = coords[0]
             last_x, last_y = coords[-1]
-            closing_line = self.ax_thermal.plot([last_x, first_x], [last_y, first_y], 'w--')[0]
+            closing_line = self._add_overlay(self.ax_thermal.plot([last_x, first_x], [last_y, first_y], 'w--')[0])
             self.point_markers.append(closing_line)
         
-        self.canvas_thermal.draw()
+        self._update_overlays()
 
-    def plot_time_series(self, timestamps, values_dict=None, mins=None, maxs=None):
-        """Plot time series data with simplified labels in legend"""
-        self.ax_timeseries.clear()
+    def plot_time_series(self, timestamps, values_dict=None, statistics=None):
+        """
+        Plot time series data with simplified labels in legend.
+        
+        Long series are drawn decimated to about 2 samples per pixel of the
+        visible range, keeping the minimum and maximum of each pixel column,
+        and decimated again when the plot is zoomed or panned. Markers are
+        only drawn once the visible samples are far enough apart.
+        """
+        self._reset_timeseries()
+        self.timeseries_x = np.array(timestamps, dtype='datetime64[ms]')
+        self.timeseries_x_num = mdates.date2num(self.timeseries_x)
+        self.timeseries_view = (0, len(timestamps), self._timeseries_width())
         
         if self.current_timeseries_data['selection_type'] == 'point':
             # Plot multiple point time series with simple point numbering
             for point_idx, values in values_dict.items():
                 _, _, color = self.points[point_idx]
                 label = f'Point {point_idx + 1}'  # Simplified label
-                self.ax_timeseries.plot(timestamps, values, 'o:', markersize=5, color=color, label=label, alpha=.85, markeredgecolor='k')
+                self._plot_series(values, 'o:', markersize=5, color=color, label=label, alpha=.85, markeredgecolor='k')
         else:
-            # Polygon statistics time series (unchanged)
-            self.ax_timeseries.plot(timestamps, values_dict['mean'], 'go:', label='Mean', alpha=1, markeredgecolor='k')
-            self.ax_timeseries.plot(timestamps, mins, 'bo:', label='Min', alpha=.85, markeredgecolor='k')
-            self.ax_timeseries.plot(timestamps, maxs, 'ro:', label='Max', alpha=.85, markeredgecolor='k')
+            # Polygon statistics time series, one line per statistic of the table
+            for name, values in statistics.items():
+                if name == 'std':
+                    continue
+                color = STATISTIC_COLORS.get(name, 'gray')
+                if name in ('mean', 'min', 'max'):
+                    self._plot_series(values, 'o:', color=color, label=get_statistic_label(name),
+                                      alpha=1 if name == 'mean' else .85, markeredgecolor='k')
+                else:
+                    self._plot_series(values, '--', color=color, linewidth=1,
+                                      label=get_statistic_label(name), alpha=.85)
+            if 'std' in statistics:
+                mean, std = np.asarray(statistics['mean']), np.asarray(statistics['std'])
+                self.timeseries_band = dict(lower=mean - std, upper=mean + std, collection=None,
+                                            properties=dict(color='green', alpha=.15, label='Mean ± Std'))
+                self._fill_band(0, len(timestamps))
         
         self.fig_timeseries.autofmt_xdate()
         
@@ -183,68 +425,133 @@ class ThermalPlotter:
         
         # Adjust layout to prevent legend cutoff
         self.fig_timeseries.tight_layout()
-
-        # Create the interactive plot HTML file
-        self.create_interactive_plot(timestamps, values_dict, mins, maxs)
+        self.series_version += 1
         
         self.canvas_timeseries.draw()
     
-    def create_interactive_plot(self, timestamps, values_dict, mins=None, maxs=None):
-        """Create the interactive Plotly plot and save to an HTML file"""
-        # Create a Plotly figure
-        fig = go.Figure()
+    def add_point_time_series(self, timestamps, point_idx, values_dict):
+        """Add the time series of one new point to the plot, keeping the existing lines"""
+        # Fall back to a full redraw if the plot does not hold exactly the previous points
+        if len(self.ax_timeseries.lines) != point_idx or self.timeseries_x is None \
+                or len(self.timeseries_x) != len(timestamps):
+            self.plot_time_series(timestamps, values_dict)
+            return
         
-        # Format timestamps for display
-        formatted_dates = [ts.strftime('%Y-%m-%d %H:%M:%S') for ts in timestamps]
+        # The whole series are shown again, so autoscaling sees all of them
+        self.timeseries_view = (0, len(timestamps), self._timeseries_width())
+        self._show_timeseries_range(0, len(timestamps))
         
-        # Add traces based on selection type
-        if self.current_timeseries_data['selection_type'] == 'point':
-            # Plot multiple point time series with simple point numbering
-            for point_idx, values in values_dict.items():
-                _, _, color = self.points[point_idx]
-                label = f'Point {point_idx + 1}'  # Simplified label
-                
-                fig.add_trace(go.Scatter(
-                    x=formatted_dates,
-                    y=values,
-                    mode='lines+markers',
-                    name=label,
-                    line=dict(color=color),
-                    marker=dict(size=8, line=dict(width=1, color='black')),
-                    hovertemplate='<b>%{fullData.name}</b><br>Time: %{x}<br>Temperature: %{y:.2f}°C<extra></extra>'
-                ))
-                
-        else:
-            # Polygon statistics time series
-            fig.add_trace(go.Scatter(
-                x=formatted_dates,
-                y=values_dict['mean'],
-                mode='lines+markers',
-                name='Mean',
-                line=dict(color='green'),
-                marker=dict(size=8, line=dict(width=1, color='black')),
-                hovertemplate='<b>Mean</b><br>Time: %{x}<br>Temperature: %{y:.2f}°C<extra></extra>'
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=formatted_dates,
-                y=mins,
-                mode='lines+markers',
-                name='Min',
-                line=dict(color='blue'),
-                marker=dict(size=8, line=dict(width=1, color='black')),
-                hovertemplate='<b>Min</b><br>Time: %{x}<br>Temperature: %{y:.2f}°C<extra></extra>'
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=formatted_dates,
-                y=maxs,
-                mode='lines+markers',
-                name='Max',
-                line=dict(color='red'),
-                marker=dict(size=8, line=dict(width=1, color='black')),
-                hovertemplate='<b>Max</b><br>Time: %{x}<br>Temperature: %{y:.2f}°C<extra></extra>'
-            ))
+        _, _, color = self.points[point_idx]
+        label = f'Point {point_idx + 1}'
+        self._plot_series(values_dict[point_idx], 'o:', markersize=5, color=color, label=label, alpha=.85, markeredgecolor='k')
+        self.ax_timeseries.relim()
+        self.ax_timeseries.autoscale_view()
+        self.ax_timeseries.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+        self.series_version += 1
+        
+        self.canvas_timeseries.draw_idle()
+    
+    def _reset_timeseries(self):
+        """Clear the time series panel and forget its series"""
+        self.ax_timeseries.clear()
+        self.timeseries_x = None
+        self.timeseries_x_num = None
+        self.timeseries_lines = []
+        self.timeseries_band = None
+        self.timeseries_view = None
+        # Clearing the axes also drops their callbacks
+        self.ax_timeseries.callbacks.connect('xlim_changed', self._on_timeseries_view_change)
+    
+    def _timeseries_width(self):
+        """Width of the time series axes in pixels"""
+        return max(int(self.ax_timeseries.bbox.width), 1)
+    
+    def _timeseries_samples(self, first, stop, *series):
+        """
+        Samples of series[first:stop] to draw: the minimum and maximum of each
+        pixel column, shared by all given series.
+        
+        Returns:
+            tuple: (indices, whether markers fit)
+        """
+        width = self._timeseries_width()
+        x = self.timeseries_x_num[first:stop]
+        indices = np.unique(np.concatenate([minmax_indices(x, values[first:stop], width) for values in series]))
+        return first + indices, (stop - first) * TIMESERIES_MARKER_SPACING <= width
+    
+    def _plot_series(self, values, fmt, **kwargs):
+        """Plot one whole series on the time series panel"""
+        values = np.asarray(values, dtype=np.float64)
+        indices, markers = self._timeseries_samples(0, len(values), values)
+        line = self.ax_timeseries.plot(self.timeseries_x[indices], values[indices], fmt, **kwargs)[0]
+        self.timeseries_lines.append((line, values, line.get_marker()))
+        if not markers:
+            line.set_marker('None')
+        return line
+    
+    def _fill_band(self, first, stop):
+        """(Re)draw the mean ± std band for samples first:stop"""
+        band = self.timeseries_band
+        if band['collection'] is not None:
+            band['collection'].remove()
+        indices, _ = self._timeseries_samples(first, stop, band['lower'], band['upper'])
+        band['collection'] = self.ax_timeseries.fill_between(
+            self.timeseries_x[indices], band['lower'][indices], band['upper'][indices], **band['properties'])
+    
+    def _show_timeseries_range(self, first, stop):
+        """Decimate all series to samples first:stop"""
+        for line, values, marker in self.timeseries_lines:
+            indices, markers = self._timeseries_samples(first, stop, values)
+            line.set_data(self.timeseries_x[indices], values[indices])
+            line.set_marker(marker if markers else 'None')
+        if self.timeseries_band is not None:
+            self._fill_band(first, stop)
+    
+    def _on_timeseries_view_change(self, *args):
+        """Decimate the series again for the visible range after a zoom, pan or resize"""
+        if self.timeseries_x_num is None:
+            return
+        x_num = self.timeseries_x_num
+        x0, x1 = sorted(self.ax_timeseries.get_xlim())
+        # One more sample on each side, so the lines reach the edges of the plot
+        first = max(int(np.searchsorted(x_num, x0)) - 1, 0)
+        stop = min(int(np.searchsorted(x_num, x1, side='right')) + 1, len(x_num))
+        view = (first, stop, self._timeseries_width())
+        if stop - first < 1 or view == self.timeseries_view:
+            return
+        self.timeseries_view = view
+        self._show_timeseries_range(first, stop)
+        self.canvas_timeseries.draw_idle()
+    
+    def create_interactive_plot(self, timestamps, values_dict, statistics=None):
+        """
+        Create the interactive Plotly figure of the time series.
+        
+        Traces use WebGL (config.INTERACTIVE_WEBGL) and numeric time values.
+        Series longer than config.INTERACTIVE_MAX_POINTS are decimated with
+        config.INTERACTIVE_DOWNSAMPLING; their full-resolution samples are
+        then embedded in a script that redraws the traces on zoom.
+        
+        Returns:
+            tuple: (figure, script) where script is the zoom script to run
+                after the plot is created, or None if no trace was decimated
+        """
+        # Milliseconds since the epoch, shown as wall-clock time on a date axis
+        x = np.array(timestamps, dtype='datetime64[ms]').astype(np.int64).astype(np.float64)
+        groups = self._interactive_traces(values_dict, statistics)
+        scatter = go.Scattergl if config.INTERACTIVE_WEBGL else go.Scatter
+        
+        fig = go.Figure()
+        decimated = False
+        for group in groups:
+            indices = downsample_indices(x, [trace['y'] for trace in group], config.INTERACTIVE_MAX_POINTS,
+                                         config.INTERACTIVE_DOWNSAMPLING)
+            decimated = decimated or len(indices) < len(x)
+            for trace in group:
+                properties = {key: value for key, value in trace.items() if key != 'y'}
+                if len(indices) > INTERACTIVE_MARKER_LIMIT:
+                    properties['mode'] = 'lines'
+                fig.add_trace(scatter(x=x[indices], y=trace['y'][indices].astype(np.float32), **properties))
         
         # Update layout for better appearance
         fig.update_layout(
@@ -262,6 +569,7 @@ class ThermalPlotter:
             margin=dict(l=20, r=20, t=40, b=20),
             plot_bgcolor='white',
             xaxis=dict(
+                type='date',
                 showgrid=True,
                 gridcolor='lightgray',
                 showline=True,
@@ -277,15 +585,113 @@ class ThermalPlotter:
             )
         )
         
-        # Save the plot to a temporary HTML file
-        self.temp_html_path = os.path.join(self.temp_dir, "temp_plot.html")
-        with open(self.temp_html_path, "w") as f:
-            f.write(to_html(fig, include_plotlyjs='cdn', full_html=True))
+        if not decimated:
+            return fig, None
+        
+        def encode(values, dtype):
+            return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+        
+        traces = [trace for group in groups for trace in group]
+        data = {
+            'x': encode(x, '<f8'),
+            'y': [encode(trace['y'], '<f4') for trace in traces],
+            'markers': ['markers' in trace['mode'] for trace in traces],
+            'groups': [],
+            'maxPoints': config.INTERACTIVE_MAX_POINTS,
+            'method': config.INTERACTIVE_DOWNSAMPLING,
+            'markerLimit': INTERACTIVE_MARKER_LIMIT
+        }
+        index = 0
+        for group in groups:
+            data['groups'].append(list(range(index, index + len(group))))
+            index += len(group)
+        return fig, ZOOM_SCRIPT.replace('__DATA__', json.dumps(data))
+    
+    def _interactive_traces(self, values_dict, statistics):
+        """
+        Plotly traces of the current selection, without their x values.
+        
+        Returns:
+            list: Groups of trace properties; traces of a group are decimated
+                to the same samples (the std band is filled between two traces)
+        """
+        groups = []
+        if self.current_timeseries_data['selection_type'] == 'point':
+            # Plot multiple point time series with simple point numbering
+            for point_idx, values in values_dict.items():
+                if point_idx >= len(self.points):  # Make sure the point exists
+                    continue
+                _, _, color = self.points[point_idx]
+                groups.append([dict(
+                    y=np.asarray(values, dtype=np.float64),
+                    mode='lines+markers',
+                    name=f'Point {point_idx + 1}',  # Simplified label
+                    line=dict(color=color),
+                    marker=dict(size=8, line=dict(width=1, color='black')),
+                    hovertemplate=HOVER_TEMPLATE
+                )])
+            return groups
+        
+        # Polygon statistics, with the std as a band around the mean
+        for name, values in statistics.items():
+            if name == 'std':
+                continue
+            groups.append([dict(
+                y=np.asarray(values, dtype=np.float64),
+                mode='lines+markers' if name in ('mean', 'min', 'max') else 'lines',
+                name=get_statistic_label(name),
+                line=dict(color=STATISTIC_COLORS.get(name, 'gray'), dash=None if name in ('mean', 'min', 'max') else 'dash'),
+                marker=dict(size=8, line=dict(width=1, color='black')),
+                hovertemplate=HOVER_TEMPLATE
+            )])
+        
+        if 'std' in statistics:
+            mean, std = np.asarray(statistics['mean'], dtype=np.float64), np.asarray(statistics['std'], dtype=np.float64)
+            groups.append([
+                dict(y=mean + std, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'),
+                dict(y=mean - std, mode='lines', line=dict(width=0), fill='tonexty',
+                     fillcolor='rgba(0, 128, 0, 0.15)', name='Mean ± Std', hoverinfo='skip')
+            ])
+        return groups
+    
+    def write_interactive_plot(self, filename):
+        """Write the interactive plot of the current time series as a standalone HTML file"""
+        series_data = self.current_timeseries_data
+        fig, script = self.create_interactive_plot(series_data['timestamps'], series_data['values'],
+                                                   series_data['statistics'])
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(to_html(fig, include_plotlyjs='cdn', full_html=True, post_script=script))
     
     def open_interactive_plot(self):
-        """Open the interactive plot in the default web browser"""
-        if hasattr(self, 'temp_html_path') and os.path.exists(self.temp_html_path):
-            webbrowser.open('file://' + os.path.abspath(self.temp_html_path))
+        """
+        Open the interactive plot of the current time series in the default web browser.
+        
+        The HTML file is generated here rather than on every plot update, and
+        reused until the series change.
+        """
+        series_data = self.current_timeseries_data
+        if series_data['timestamps'] is None:
+            return
+        
+        if self.interactive_plot is None or self.interactive_plot[0] != self.series_version \
+                or not os.path.exists(self.interactive_plot[1]):
+            html_path = os.path.join(self._get_temp_dir(), f"time_series_{self.series_version}.html")
+            self.write_interactive_plot(html_path)
+            if self.interactive_plot is not None and self.interactive_plot[1] != html_path:
+                try:
+                    os.remove(self.interactive_plot[1])
+                except OSError:
+                    pass
+            self.interactive_plot = (self.series_version, html_path)
+        
+        webbrowser.open('file://' + os.path.abspath(self.interactive_plot[1]))
+    
+    def _get_temp_dir(self):
+        """Create the temp directory of this session, removed when the application exits"""
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix="thermal_digger-")
+            atexit.register(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        return self.temp_dir
     
     # --------------------------------------
     
@@ -308,23 +714,24 @@ class ThermalPlotter:
         
         # Clear any additional lines that might be part of the polygon
         # This is important because some lines might not be in point_markers
-        for line in self.ax_thermal.lines:
+        # (the frame image is kept, overlays would otherwise stay across frames)
+        for line in list(self.ax_thermal.lines):
             line.remove()
         
         # Reset data storage
         self.current_timeseries_data = {
             'timestamps': None,
             'values': {},
-            'mins': None,
-            'maxs': None,
+            'statistics': None,
             'selection_type': None
         }
         
-        # Redraw the canvas to ensure all elements are properly cleared
-        self.canvas_thermal.draw()
+        # Redraw the selection layer to ensure all elements are properly cleared
+        self._update_overlays()
         
         # Clear time series plot
-        self.ax_timeseries.clear()
+        self._reset_timeseries()
+        self.series_version += 1
         self.canvas_timeseries.draw()
 
     def clear_polygon(self):
@@ -334,11 +741,12 @@ class ThermalPlotter:
             self.polygon_patch = None
         
         # Clear any point markers
-        for artist in self.ax_thermal.lines:
+        for artist in list(self.ax_thermal.lines):
             artist.remove()
         
-        self.canvas_thermal.draw()
-        self.ax_timeseries.clear()
+        self._update_overlays()
+        self._reset_timeseries()
+        self.series_version += 1
         self.canvas_timeseries.draw()
         
     def clear_workspace(self):
@@ -360,15 +768,21 @@ class ThermalPlotter:
         # Remove colorbar if it exists
         if len(self.fig_thermal.axes) > 1:
             self.fig_thermal.delaxes(self.fig_thermal.axes[1])
+        self.thermal_image = None
+        self.colorbar = None
+        self.thermal_background = None
+        self.overlay_background = None
+        self.ax_thermal.title.set_animated(False)
         
         # Clear time series plot
-        self.ax_timeseries.clear()
+        self._reset_timeseries()
         self.ax_timeseries.set_title('Temperature Statistics')
         self.ax_timeseries.set_xlabel('Time')
         self.ax_timeseries.set_ylabel('Temperature (°C)')
         self.ax_timeseries.grid(True)
         self.ax_timeseries.set_xlim(0, 1)
         self.ax_timeseries.set_ylim(0, 1)
+        self.series_version += 1
         
         # Redraw both canvases
         self.canvas_thermal.draw()
@@ -376,28 +790,22 @@ class ThermalPlotter:
 
     def create_polygon_mask(self, data_shape, polygon_coords):
         """Create boolean mask from polygon coordinates"""
-        mask = np.zeros(data_shape, dtype=bool)
-        
-        # Convert polygon coordinates to integer indices
-        polygon_coords_int = np.array(polygon_coords).astype(int)
-        
-        # Create vertex list for path
-        path = Path(polygon_coords_int)
-        
-        # Create grid of points
-        x, y = np.meshgrid(np.arange(data_shape[1]), np.arange(data_shape[0]))
-        points = np.vstack((x.flatten(), y.flatten())).T
-        
-        # Test which points are inside the polygon
-        mask = path.contains_points(points).reshape(data_shape)
-        
-        return mask
+        return get_polygon_mask(polygon_coords, data_shape).to_dense()
 
     def save_plots(self, base_filename):
         """Save both thermal and time series plots, and time series data as CSV"""
-        # Save thermal image plot
+        # Save thermal image plot, with the blitted frame and selections drawn normally
         thermal_filename = f"{base_filename}_thermal.png"
-        self.fig_thermal.savefig(thermal_filename, bbox_inches='tight', dpi=300)
+        frame_artists = [self.thermal_image, self.ax_thermal.title] if self.thermal_image else []
+        frame_artists += self._overlay_artists()
+        for artist in frame_artists:
+            artist.set_animated(False)
+        try:
+            self.fig_thermal.savefig(thermal_filename, bbox_inches='tight', dpi=300)
+        finally:
+            for artist in frame_artists:
+                artist.set_animated(True)
+            self.canvas_thermal.draw_idle()
         
         # Save time series plot
         timeseries_filename = f"{base_filename}_timeseries.png"
@@ -408,72 +816,7 @@ class ThermalPlotter:
         if self.current_timeseries_data['timestamps'] is not None:
             html_filename = f"{base_filename}_interactive_timeseries.html"
             
-            # Create a new Plotly figure for saving
-            fig = go.Figure()
-            
-            formatted_dates = [ts.strftime('%Y-%m-%d %H:%M:%S') 
-                              for ts in self.current_timeseries_data['timestamps']]
-            
-            if self.current_timeseries_data['selection_type'] == 'point':
-                for point_idx, values in self.current_timeseries_data['values'].items():
-                    if point_idx < len(self.points):  # Make sure the point exists
-                        _, _, color = self.points[point_idx]
-                        label = f'Point {point_idx + 1}'
-                        
-                        fig.add_trace(go.Scatter(
-                            x=formatted_dates,
-                            y=values,
-                            mode='lines+markers',
-                            name=label,
-                            line=dict(color=color),
-                            marker=dict(size=8, line=dict(width=1, color='black'))
-                        ))
-            else:
-                fig.add_trace(go.Scatter(
-                    x=formatted_dates,
-                    y=self.current_timeseries_data['values']['mean'],
-                    mode='lines+markers',
-                    name='Mean',
-                    line=dict(color='green'),
-                    marker=dict(size=8, line=dict(width=1, color='black'))
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=formatted_dates,
-                    y=self.current_timeseries_data['mins'],
-                    mode='lines+markers',
-                    name='Min',
-                    line=dict(color='blue'),
-                    marker=dict(size=8, line=dict(width=1, color='black'))
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=formatted_dates,
-                    y=self.current_timeseries_data['maxs'],
-                    mode='lines+markers',
-                    name='Max',
-                    line=dict(color='red'),
-                    marker=dict(size=8, line=dict(width=1, color='black'))
-                ))
-            
-            # Update layout
-            fig.update_layout(
-                title='Interactive Temperature Time Series',
-                xaxis_title='Time',
-                yaxis_title='Temperature (°C)',
-                hovermode='closest',
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
-            )
-            
-            # Save the interactive HTML file
-            with open(html_filename, 'w') as f:
-                f.write(to_html(fig, include_plotlyjs='cdn', full_html=True))
+            self.write_interactive_plot(html_filename)
 
         # Save time series data as CSV if available
         csv_filename = None
@@ -502,12 +845,9 @@ class ThermalPlotter:
                 column_name = f'Point_{point_idx + 1}'  # Simplified column name
                 data_dict[column_name] = values
         else:
-            # Polygon statistics (unchanged)
-            data_dict.update({
-                'Mean_Temperature': self.current_timeseries_data['values']['mean'],
-                'Min_Temperature': self.current_timeseries_data['mins'],
-                'Max_Temperature': self.current_timeseries_data['maxs']
-            })
+            # Polygon statistics, one column per statistic of the table
+            for name, values in self.current_timeseries_data['statistics'].items():
+                data_dict[f'{get_statistic_label(name)}_Temperature'] = values
         
         # Create DataFrame and save to CSV
         df = pd.DataFrame(data_dict)
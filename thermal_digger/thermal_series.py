@@ -0,0 +1,460 @@
+"""
+Time-series extraction for selections on thermal datasets.
+
+Every frame is read at most once per extraction, and all selected pixels are
+gathered from it in a single indexing operation, so the cost of a selection
+is dominated by the number of frames, not the number of selected pixels.
+Polygon statistics are computed by one kernel for a whole block of frames.
+"""
+
+import warnings
+from functools import lru_cache
+import numpy as np
+from matplotlib.path import Path
+from thermal_data import ThermalDataHandler
+from utils.config import config
+from utils.jobs import check_cancelled
+
+# Largest block of polygon pixels reduced at once by the statistics kernel
+STATISTICS_BLOCK_BYTES = 32 * 1024 * 1024
+
+
+class PolygonMask:
+    """
+    Pixels of a frame inside a polygon, stored sparsely.
+
+    The mask is kept as the polygon's bounding box (a pair of slices) plus
+    the boolean sub-mask within it, and as flat pixel indices into the frame.
+    Gathering the pixels therefore only touches the bounding box.
+    """
+
+    def __init__(self, shape, rows, cols, sub_mask):
+        """
+        Parameters:
+            shape (tuple): Frame shape (H, W)
+            rows (slice): Row range of the bounding box
+            cols (slice): Column range of the bounding box
+            sub_mask (numpy.ndarray): Boolean mask within the bounding box
+        """
+        self.shape = shape
+        self.rows = rows
+        self.cols = cols
+        self.sub_mask = sub_mask
+        sub_rows, sub_cols = np.nonzero(sub_mask)
+        self.flat_indices = np.ravel_multi_index((sub_rows + rows.start, sub_cols + cols.start), shape)
+        self.sub_mask.flags.writeable = False
+        self.flat_indices.flags.writeable = False
+
+    def __len__(self):
+        return len(self.flat_indices)
+
+    def gather(self, data):
+        """
+        Return the pixels inside the polygon.
+
+        Parameters:
+            data: Array of shape (..., H, W), e.g. a frame or a ThermalCube
+
+        Returns:
+            numpy.ndarray: Array of shape (..., n_pixels)
+        """
+        return data[..., self.rows, self.cols][..., self.sub_mask]
+
+    def to_dense(self):
+        """Return the mask as a full-frame boolean array."""
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[self.rows, self.cols] = self.sub_mask
+        return mask
+
+
+def get_polygon_mask(polygon_coords, shape):
+    """
+    Return the (cached) PolygonMask of a polygon for a frame shape.
+
+    Parameters:
+        polygon_coords (list): Polygon vertices as (x, y) pairs
+        shape (tuple): Frame shape (H, W)
+
+    Returns:
+        PolygonMask: Pixels whose integer (x, y) position lies inside the
+            polygon, with the vertices truncated to integers
+    """
+    # Vertices are truncated to pixels, so equal pixel polygons share a cache entry
+    vertices = tuple(tuple(vertex) for vertex in np.asarray(polygon_coords).astype(int).tolist())
+    return _rasterize_polygon(vertices, tuple(shape))
+
+
+@lru_cache(maxsize=32)
+def _rasterize_polygon(vertices, shape):
+    """Rasterize a polygon within its bounding box."""
+    height, width = shape
+    xs = [x for x, _ in vertices]
+    ys = [y for _, y in vertices]
+    rows = slice(min(max(min(ys), 0), height), min(max(max(ys) + 1, 0), height))
+    cols = slice(min(max(min(xs), 0), width), min(max(max(xs) + 1, 0), width))
+
+    # Only pixels of the bounding box can be inside the polygon
+    x, y = np.meshgrid(np.arange(cols.start, cols.stop), np.arange(rows.start, rows.stop))
+    points = np.column_stack((x.ravel(), y.ravel()))
+    sub_mask = Path(vertices).contains_points(points).reshape(x.shape)
+    return PolygonMask(shape, rows, cols, sub_mask)
+
+
+def get_pixel_indices(points):
+    """
+    Round selected (x, y) positions to pixel indices.
+
+    Returns:
+        tuple: (xs, ys) integer arrays
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    xs = np.round(points[:, 0]).astype(np.intp)
+    ys = np.round(points[:, 1]).astype(np.intp)
+    return xs, ys
+
+
+def extract_point_series(points, files, camera_type, cube=None, cancel_event=None):
+    """
+    Extract the temperature time series of several pixels at once.
+
+    Parameters:
+        points (list): Selected (x, y) positions in image coordinates
+        files (list): CSV files of the dataset, in time order
+        camera_type (CameraType): Camera type of the files
+        cube (ThermalCube): Cube store of the dataset. If given, the series
+            are sliced from it instead of loading the files.
+        cancel_event (threading.Event): Checked before every frame read from
+            the files; the extraction stops when it is set
+
+    Returns:
+        numpy.ndarray: (T, n_points) array of temperatures. Points outside a
+            frame, and frames that fail to load, are NaN.
+
+    Raises:
+        JobCancelled: If cancel_event was set
+    """
+    xs, ys = get_pixel_indices(points)
+    n_frames = len(cube) if cube is not None else len(files)
+    series = np.full((n_frames, len(xs)), np.nan)
+
+    if cube is not None:
+        height, width = cube.frame_shape
+        inside = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+        _warn_outside(xs[~inside], ys[~inside], "the loaded images")
+        if inside.any():
+            # One fancy-indexing read gathers all pixels of all frames
+            series[:, inside] = cube[:, ys[inside], xs[inside]]
+        return series
+
+    warned = np.zeros(len(xs), dtype=bool)
+    frames = ThermalDataHandler.iter_frames(files, camera_type, sort=False, skip_errors=True)
+    try:
+        for t, (csv_file, (_, data)) in enumerate(zip(files, frames)):
+            check_cancelled(cancel_event)
+            height, width = data.shape
+            inside = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+            # Report each point only for the first frame it falls outside of
+            newly_outside = ~inside & ~warned
+            _warn_outside(xs[newly_outside], ys[newly_outside], f"image {csv_file}")
+            warned |= newly_outside
+            series[t, inside] = data[ys[inside], xs[inside]]
+    finally:
+        # Stops the read-ahead thread when cancelled
+        frames.close()
+
+    return series
+
+
+def _warn_outside(xs, ys, where):
+    """Report selected pixels outside the image bounds."""
+    for x, y in zip(xs, ys):
+        print(f"Warning: Point ({x}, {y}) is out of bounds for {where}")
+
+
+class PointSeriesStore:
+    """
+    Time series of the selected points of a dataset, extended point by point.
+
+    Series already extracted are kept, so adding a point to the selection
+    only extracts that point's column: O(T) work instead of O(T × points).
+    """
+
+    def __init__(self, files, camera_type, cube=None):
+        """
+        Initialize an empty store for a dataset.
+
+        Parameters:
+            files (list): CSV files of the dataset, in time order
+            camera_type (CameraType): Camera type of the files
+            cube (ThermalCube): Cube store of the dataset, if any
+        """
+        self.files = files
+        self.camera_type = camera_type
+        self.cube = cube
+        self.points = []
+        self.values = {}  # Point index -> list of temperatures
+        n_frames = len(cube) if cube is not None else len(files)
+        self._series = np.empty((n_frames, 4))
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def series(self):
+        """(T, n_points) array of the stored series."""
+        return self._series[:, :len(self.points)]
+
+    def is_for(self, files, camera_type, cube=None):
+        """Return True if the store belongs to this dataset."""
+        return files is self.files and camera_type == self.camera_type and cube is self.cube
+
+    def missing_points(self, points):
+        """
+        Return the points of a selection whose series are not stored yet.
+
+        Does not change the store, so the series can be extracted elsewhere
+        (e.g. on a worker thread) and stored with add_series.
+
+        Returns:
+            tuple: (start, new_points), the index of the first missing point
+                and the missing points
+        """
+        points = [tuple(point) for point in points]
+        start = len(self.points) if points[:len(self.points)] == self.points else 0
+        return start, points[start:]
+
+    def add_series(self, points, start, columns):
+        """
+        Store the series extracted for missing_points(points).
+
+        Parameters:
+            points (list): The selection passed to missing_points
+            start (int): Index of the first extracted point
+            columns (numpy.ndarray): (T, n) series of the missing points
+
+        Returns:
+            list: Indices of the stored points
+        """
+        points = [tuple(point) for point in points]
+        if start == 0:
+            self.points = []
+            self.values = {}
+
+        # Grow the buffer geometrically so appending stays amortized O(T)
+        needed = len(points)
+        if needed > self._series.shape[1]:
+            grown = np.empty((self._series.shape[0], max(needed, 2 * self._series.shape[1])))
+            grown[:, :start] = self._series[:, :start]
+            self._series = grown
+
+        self._series[:, start:needed] = columns
+        for offset in range(needed - start):
+            self.values[start + offset] = columns[:, offset].tolist()
+        self.points = points
+        return list(range(start, needed))
+
+    def append_frames(self, frames):
+        """
+        Extend the stored series with new frames appended to the dataset.
+
+        Parameters:
+            frames (list): The new frames, in time order
+        """
+        xs, ys = get_pixel_indices(self.points)
+        rows = np.full((len(frames), self._series.shape[1]), np.nan)
+        for t, data in enumerate(frames):
+            height, width = data.shape
+            inside = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+            rows[t, :len(xs)][inside] = data[ys[inside], xs[inside]]
+        self._series = np.vstack([self._series, rows])
+        for point_idx in range(len(self.points)):
+            self.values[point_idx].extend(rows[:, point_idx].tolist())
+
+
+def get_statistic_percentile(name):
+    """
+    Return the percentile computed by an order statistic, or None.
+
+    "min", "max" and "median" are the 0th, 100th and 50th percentiles; "pNN"
+    is the NN-th percentile (e.g. "p5", "p95", "p99.5").
+
+    Raises:
+        ValueError: If the name is not a known statistic
+    """
+    if name in ("mean", "std"):
+        return None
+    if name in ("min", "max", "median"):
+        return {"min": 0.0, "max": 100.0, "median": 50.0}[name]
+    if name.startswith("p"):
+        try:
+            q = float(name[1:])
+        except ValueError:
+            q = -1.0
+        if 0 <= q <= 100:
+            return q
+    raise ValueError(f"Unknown statistic: {name}")
+
+
+def get_statistic_label(name):
+    """Display label of a statistic, e.g. 'Mean' or 'P95'."""
+    return name.upper() if name.startswith('p') else name.capitalize()
+
+
+def compute_statistics(values, statistics):
+    """
+    Compute several statistics of each row of a block in one pass.
+
+    All order statistics (min, max, median, percentiles) come from a single
+    np.partition call per block, so no row is ever fully sorted. Percentiles
+    use linear interpolation, like np.percentile. Rows containing NaN are
+    reduced with the NaN-ignoring functions instead.
+
+    Parameters:
+        values (numpy.ndarray): (n_rows, n_pixels) block, one row per frame
+        statistics (sequence): Statistic names, see get_statistic_percentile
+
+    Returns:
+        dict: Statistic name -> (n_rows,) float array
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_rows, n_pixels = values.shape
+    percentiles = {name: get_statistic_percentile(name) for name in statistics}
+    if n_pixels == 0:
+        return {name: np.full(n_rows, np.nan) for name in statistics}
+
+    table = {}
+    order_names = [name for name, q in percentiles.items() if q is not None]
+    if order_names:
+        positions = {name: percentiles[name] / 100 * (n_pixels - 1) for name in order_names}
+        kth = sorted({int(np.floor(pos)) for pos in positions.values()}
+                     | {int(np.ceil(pos)) for pos in positions.values()})
+        partitioned = np.partition(values, kth, axis=1)
+        for name in order_names:
+            pos = positions[name]
+            low, high = int(np.floor(pos)), int(np.ceil(pos))
+            column = partitioned[:, low]
+            if high != low:
+                column = column + (partitioned[:, high] - column) * (pos - low)
+            table[name] = column
+
+    if "mean" in percentiles or "std" in percentiles:
+        mean = values.mean(axis=1)
+        if "mean" in percentiles:
+            table["mean"] = mean
+        if "std" in percentiles:
+            table["std"] = np.sqrt(np.square(values - mean[:, None]).mean(axis=1))
+
+    # Gaps in the data: redo the affected rows ignoring NaN
+    nan_rows = np.flatnonzero(np.isnan(values).any(axis=1))
+    if len(nan_rows):
+        with warnings.catch_warnings():
+            # All-NaN rows legitimately give NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            block = values[nan_rows]
+            for name, q in percentiles.items():
+                if name == "mean":
+                    table[name][nan_rows] = np.nanmean(block, axis=1)
+                elif name == "std":
+                    table[name][nan_rows] = np.nanstd(block, axis=1)
+                else:
+                    table[name][nan_rows] = np.nanpercentile(block, q, axis=1)
+
+    return {name: table[name] for name in statistics}
+
+
+def get_polygon_statistic_names(statistics=None):
+    """Resolve the statistics to compute; "mean" is always included."""
+    if statistics is None:
+        statistics = config.POLYGON_STATISTICS
+    statistics = list(dict.fromkeys(statistics))
+    for name in statistics:
+        get_statistic_percentile(name)
+    if "mean" not in statistics:
+        statistics.insert(0, "mean")
+    return statistics
+
+
+def extract_polygon_statistics(polygon_coords, files, camera_type, cube=None, statistics=None,
+                               cancel_event=None):
+    """
+    Compute statistics of the pixels inside a polygon for every frame.
+
+    Parameters:
+        polygon_coords (list): Polygon vertices as (x, y) pairs
+        files (list): CSV files of the dataset, in time order
+        camera_type (CameraType): Camera type of the files
+        cube (ThermalCube): Cube store of the dataset. If given, blocks of
+            frames are sliced from it instead of loading the files.
+        statistics (sequence): Statistic names. Defaults to
+            config.POLYGON_STATISTICS; "mean" is always included.
+        cancel_event (threading.Event): Checked before every frame or block
+            of frames; the extraction stops when it is set
+
+    Returns:
+        dict: Columnar table, statistic name -> (T,) float array. Frames
+            that fail to load or have no pixels in the polygon are NaN.
+
+    Raises:
+        ValueError: If a statistic name is unknown
+        JobCancelled: If cancel_event was set
+    """
+    statistics = get_polygon_statistic_names(statistics)
+    n_frames = len(cube) if cube is not None else len(files)
+    table = {name: np.full(n_frames, np.nan) for name in statistics}
+
+    if cube is not None:
+        mask = get_polygon_mask(polygon_coords, cube.frame_shape)
+        if len(mask) == 0:
+            print("Warning: No data points inside polygon")
+            return table
+        # Reduce blocks of frames at once, only reading the polygon's bounding box
+        block_frames = max(1, STATISTICS_BLOCK_BYTES // (8 * len(mask)))
+        for start in range(0, n_frames, block_frames):
+            check_cancelled(cancel_event)
+            stop = min(start + block_frames, n_frames)
+            block = cube[start:stop, mask.rows, mask.cols][:, mask.sub_mask]
+            for name, column in compute_statistics(block, statistics).items():
+                table[name][start:stop] = column
+        return table
+
+    frames = ThermalDataHandler.iter_frames(files, camera_type, sort=False, skip_errors=True)
+    try:
+        for t, (csv_file, (_, data)) in enumerate(zip(files, frames)):
+            check_cancelled(cancel_event)
+            _store_frame_statistics(table, t, polygon_coords, data, statistics, csv_file)
+    finally:
+        frames.close()
+
+    return table
+
+
+def append_polygon_statistics(table, polygon_coords, frames, files=None):
+    """
+    Extend a table of extract_polygon_statistics with new frames.
+
+    Parameters:
+        table (dict): Table to extend; its columns define the statistics
+        polygon_coords (list): Polygon vertices as (x, y) pairs
+        frames (list): The new frames, in time order
+        files (list): CSV files of the frames, used in warnings
+
+    Returns:
+        dict: The extended table
+    """
+    statistics = list(table)
+    new_rows = {name: np.full(len(frames), np.nan) for name in statistics}
+    for t, data in enumerate(frames):
+        _store_frame_statistics(new_rows, t, polygon_coords, data, statistics,
+                                files[t] if files else "")
+    return {name: np.append(table[name], new_rows[name]) for name in statistics}
+
+
+def _store_frame_statistics(table, t, polygon_coords, data, statistics, csv_file):
+    """Compute the polygon statistics of one frame into row `t` of a table."""
+    # The mask is rasterized once and reused for every frame of the same size
+    masked_data = get_polygon_mask(polygon_coords, data.shape).gather(data)
+    if len(masked_data) == 0:
+        print(f"Warning: No data points inside polygon for image {csv_file}")
+        return
+    for name, column in compute_statistics(masked_data[None, :], statistics).items():
+        table[name][t] = column[0]
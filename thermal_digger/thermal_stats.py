@@ -0,0 +1,415 @@
+"""
+Dataset-level temperature statistics.
+
+Every frame is summarized once during ingest by a fixed-bin histogram plus
+its min, max and mean. Histograms of any subset of frames can be merged by
+adding them up, so colour ranges and percentiles of the whole dataset (or of
+a single day) are answered without reading a single pixel again.
+
+Per-pixel statistics over the whole time series (compute_pixel_statistics)
+are reduced block by block with mergeable partial aggregates, so memory use
+depends on the block size and not on the length of the dataset.
+"""
+
+import os
+import numpy as np
+from thermal_catalog import get_catalog_entries
+from thermal_data import ThermalDataHandler
+from utils.config import config
+
+
+def get_histogram_bins():
+    """
+    Return the configured histogram bins.
+
+    Returns:
+        tuple: (lower, bin_width, n_bins)
+    """
+    n_bins = int(round((config.HISTOGRAM_MAX - config.HISTOGRAM_MIN) / config.HISTOGRAM_BIN_WIDTH))
+    return config.HISTOGRAM_MIN, config.HISTOGRAM_BIN_WIDTH, n_bins
+
+
+def frame_histogram(data, lower=None, bin_width=None, n_bins=None):
+    """
+    Count the (non-NaN) temperatures of a frame in fixed bins.
+
+    Bin 0 counts values below `lower` and the last bin values above the
+    upper edge, so no value is ever dropped. Defaults come from
+    get_histogram_bins().
+
+    Returns:
+        numpy.ndarray: int32 counts of length n_bins + 2
+    """
+    if lower is None:
+        lower, bin_width, n_bins = get_histogram_bins()
+    values = np.asarray(data, dtype=np.float64).ravel()
+    values = values[~np.isnan(values)]
+    bins = np.floor((values - lower) / bin_width).astype(np.int64) + 1
+    np.clip(bins, 0, n_bins + 1, out=bins)
+    return np.bincount(bins, minlength=n_bins + 2).astype(np.int32)
+
+
+def select_frames(timestamps, start=None, end=None):
+    """
+    Return the indices of the frames with start <= timestamp < end.
+
+    Parameters:
+        timestamps (list): Frame timestamps
+        start (datetime): First timestamp to include, None for no lower bound
+        end (datetime): First timestamp to exclude, None for no upper bound
+    """
+    return [index for index, timestamp in enumerate(timestamps)
+            if (start is None or timestamp >= start) and (end is None or timestamp < end)]
+
+
+class HistogramIndex:
+    """
+    Per-frame histograms, minima, maxima and means of a dataset.
+
+    Percentiles are interpolated within a bin, so they are accurate to the
+    bin width (config.HISTOGRAM_BIN_WIDTH), and are clipped to the actual
+    minimum and maximum of the selected frames.
+    """
+
+    def __init__(self, counts, mins, maxs, means, lower, bin_width):
+        """
+        Parameters:
+            counts (numpy.ndarray): (T, n_bins + 2) histogram counts, see frame_histogram
+            mins, maxs, means (numpy.ndarray): (T,) per-frame min, max and mean
+            lower (float): Lower edge of the first regular bin
+            bin_width (float): Width of the bins in °C
+        """
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.mins = np.asarray(mins, dtype=np.float64)
+        self.maxs = np.asarray(maxs, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.lower = float(lower)
+        self.bin_width = float(bin_width)
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def n_bins(self):
+        """Number of regular bins (without the underflow and overflow bins)."""
+        return self.counts.shape[1] - 2
+
+    @classmethod
+    def from_summaries(cls, summaries):
+        """Build the index from frame summaries (see thermal_ingest.summarize_frame)."""
+        lower, bin_width, n_bins = get_histogram_bins()
+        counts = np.zeros((len(summaries), n_bins + 2), dtype=np.int32)
+        for index, summary in enumerate(summaries):
+            counts[index] = summary['histogram']
+        return cls(counts,
+                   [summary['min'] for summary in summaries],
+                   [summary['max'] for summary in summaries],
+                   [summary['mean'] for summary in summaries],
+                   lower, bin_width)
+
+    def extended(self, summaries):
+        """
+        Return a new index with the summaries of new frames appended.
+
+        Raises:
+            ValueError: If the histograms use different bins than the index
+        """
+        if any(len(summary['histogram']) != self.counts.shape[1] for summary in summaries):
+            raise ValueError("Frame histograms do not match the bins of the index")
+        return HistogramIndex(
+            np.vstack([self.counts] + [np.asarray(summary['histogram'], dtype=np.int32)[None, :]
+                                       for summary in summaries]),
+            np.append(self.mins, [summary['min'] for summary in summaries]),
+            np.append(self.maxs, [summary['max'] for summary in summaries]),
+            np.append(self.means, [summary['mean'] for summary in summaries]),
+            self.lower, self.bin_width)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()."""
+        with np.load(path) as stored:
+            lower, bin_width = stored['bins']
+            return cls(stored['counts'], stored['mins'], stored['maxs'], stored['means'],
+                       lower, bin_width)
+
+    def save(self, path):
+        """Save the index as a .npz file, replacing any existing file atomically."""
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, counts=self.counts, mins=self.mins, maxs=self.maxs, means=self.means,
+                     bins=np.array([self.lower, self.bin_width]))
+        os.replace(tmp_path, path)
+
+    def _select(self, indices):
+        """Return an index expression for a subset of frames (all frames for None)."""
+        return slice(None) if indices is None else np.asarray(indices, dtype=np.intp)
+
+    def merged(self, indices=None):
+        """Return the histogram of a subset of frames."""
+        return self.counts[self._select(indices)].sum(axis=0, dtype=np.int64)
+
+    def mean(self, indices=None):
+        """Mean temperature of a subset of frames, weighted by valid pixels."""
+        selection = self._select(indices)
+        weights = self.counts[selection].sum(axis=1, dtype=np.int64)
+        if weights.sum() == 0:
+            return np.nan
+        return float(np.average(self.means[selection], weights=weights))
+
+    def percentile(self, q, indices=None):
+        """
+        Percentile(s) of all temperatures of a subset of frames.
+
+        Parameters:
+            q (float or sequence): Percentile(s) between 0 and 100
+            indices (sequence): Frame indices, None for all frames
+
+        Returns:
+            float or numpy.ndarray: One value per percentile, NaN if the
+                frames contain no temperatures
+        """
+        selection = self._select(indices)
+        low, high = np.nanmin(self.mins[selection]), np.nanmax(self.maxs[selection])
+        values = self._interpolate(self.merged(indices)[None, :], np.atleast_1d(q), low, high)[0]
+        return float(values[0]) if np.ndim(q) == 0 else values
+
+    def frame_percentiles(self, q, indices=None):
+        """
+        Percentile `q` of each frame of a subset.
+
+        Returns:
+            numpy.ndarray: One value per frame
+        """
+        frames = np.arange(len(self))[self._select(indices)]
+        result = np.empty(len(frames))
+        # Work in blocks to bound the size of the cumulative histograms
+        for start in range(0, len(frames), 1024):
+            block = frames[start:start + 1024]
+            result[start:start + len(block)] = self._interpolate(
+                self.counts[block], np.array([q], dtype=float), self.mins[block], self.maxs[block])[:, 0]
+        return result
+
+    def color_range(self, indices=None, low=15, high=95):
+        """
+        Display range of a subset of frames: the lowest per-frame `low`
+        percentile and the highest per-frame `high` percentile.
+
+        Returns:
+            tuple: (vmin, vmax)
+        """
+        return (float(np.nanmin(self.frame_percentiles(low, indices))),
+                float(np.nanmax(self.frame_percentiles(high, indices))))
+
+    def _interpolate(self, counts, qs, lows, highs):
+        """
+        Interpolate percentiles from histograms.
+
+        Parameters:
+            counts (numpy.ndarray): (n, n_bins + 2) histograms
+            qs (numpy.ndarray): Percentiles
+            lows, highs: Minimum and maximum of each histogram's values
+
+        Returns:
+            numpy.ndarray: (n, len(qs)) percentiles
+        """
+        cumulative = np.cumsum(counts, axis=1, dtype=np.int64)
+        totals = cumulative[:, -1]
+        # Rank of the percentile among the sorted values, as in np.percentile
+        ranks = np.outer(np.maximum(totals - 1, 0), qs / 100.0)
+        lows = np.broadcast_to(np.asarray(lows, dtype=float).reshape(-1, 1), ranks.shape)
+        highs = np.broadcast_to(np.asarray(highs, dtype=float).reshape(-1, 1), ranks.shape)
+        result = np.full(ranks.shape, np.nan)
+        for row in np.flatnonzero(totals):
+            bins = np.searchsorted(cumulative[row], ranks[row], side='right')
+            before = np.where(bins > 0, cumulative[row][np.maximum(bins - 1, 0)], 0)
+            fraction = (ranks[row] - before + 0.5) / counts[row][bins]
+            # Bin 0 is the underflow bin, regular bins start at `lower`
+            values = self.lower + (bins - 1 + fraction) * self.bin_width
+            # Values outside the binned range are only known by their min and max
+            values[bins == 0] = lows[row][bins == 0]
+            values[bins == self.n_bins + 1] = highs[row][bins == self.n_bins + 1]
+            result[row] = values
+        return np.clip(result, lows, highs)
+
+
+# Maps written by compute_pixel_statistics
+PIXEL_STATISTICS = ("count", "mean", "std", "min", "max")
+
+
+class PixelAggregate:
+    """
+    Per-pixel count, mean, sum of squared deviations, min and max of a
+    block of frames.
+
+    Aggregates of consecutive blocks are merged with the pairwise update of
+    Chan et al., which is numerically stable (unlike summing squares) and
+    gives the same result whatever the block sizes. NaN values are ignored.
+    """
+
+    def __init__(self, shape):
+        """
+        Initialize an empty aggregate.
+
+        Parameters:
+            shape (tuple): Shape of the pixel grid (e.g. a tile of a frame)
+        """
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.nan)
+        self.max = np.full(shape, np.nan)
+
+    @classmethod
+    def from_block(cls, block):
+        """
+        Aggregate a block of frames.
+
+        Parameters:
+            block (numpy.ndarray): (n, ...) values, one frame (or tile) per row
+        """
+        block = np.asarray(block, dtype=np.float64)
+        aggregate = cls(block.shape[1:])
+        valid = ~np.isnan(block)
+        aggregate.count = valid.sum(axis=0, dtype=np.int64)
+        counted = np.maximum(aggregate.count, 1)
+        aggregate.mean = np.where(valid, block, 0.0).sum(axis=0) / counted
+        deviations = np.where(valid, block - aggregate.mean, 0.0)
+        aggregate.m2 = np.square(deviations).sum(axis=0)
+        # fmin/fmax skip NaN without warning on pixels that are NaN in every frame
+        aggregate.min = np.fmin.reduce(block, axis=0)
+        aggregate.max = np.fmax.reduce(block, axis=0)
+        return aggregate
+
+    def merge(self, other):
+        """Merge the aggregate of another block of frames into this one."""
+        count = self.count + other.count
+        counted = np.maximum(count, 1)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / counted)
+        self.m2 = self.m2 + other.m2 + np.square(delta) * (self.count * other.count / counted)
+        self.count = count
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+
+    def update(self, block):
+        """Add a block of frames, see from_block."""
+        self.merge(self.from_block(block))
+
+    def result(self):
+        """
+        Return the statistic maps.
+
+        Returns:
+            dict: 'count', 'mean', 'std' (population standard deviation,
+                as np.std), 'min' and 'max'; NaN where a pixel has no values
+        """
+        counted = np.maximum(self.count, 1)
+        empty = self.count == 0
+        return {
+            'count': self.count,
+            'mean': np.where(empty, np.nan, self.mean),
+            'std': np.where(empty, np.nan, np.sqrt(self.m2 / counted)),
+            'min': self.min,
+            'max': self.max
+        }
+
+
+def compute_pixel_statistics(source, output_dir, camera_type=None, indices=None,
+                             chunk_mb=None, progress_callback=None):
+    """
+    Compute per-pixel statistics over a time series and write them as maps.
+
+    A cube is reduced in spatial tiles (bands of rows) and temporal chunks
+    of about `chunk_mb` each, so only one block and the aggregates of one
+    tile are in memory at a time. A list of CSV files is streamed with
+    ThermalDataHandler.iter_frames in batches of whole frames. Either way
+    memory use is a small multiple of `chunk_mb`, whatever the number of frames.
+
+    Parameters:
+        source (ThermalCube or list): Cube, or CSV files in time order
+        output_dir (str): Directory for the maps, one .npy file per statistic
+            (see PIXEL_STATISTICS)
+        camera_type (CameraType): Camera type, for a list of files
+        indices (sequence): Frame indices to include (e.g. from
+            select_frames), None for all frames
+        chunk_mb (float): Block size, defaults to config.PIXEL_STATS_CHUNK_MB
+        progress_callback (callable): Called as progress_callback(completed, total)
+            with the number of frames (times tiles) reduced so far
+
+    Returns:
+        dict: Statistic name -> read-only memory-mapped map
+
+    Raises:
+        ValueError: If no frames are selected or none can be read, or if
+            frames differ in shape
+    """
+    if chunk_mb is None:
+        chunk_mb = config.PIXEL_STATS_CHUNK_MB
+    budget = int(chunk_mb * 1024 * 1024)
+    frames = np.arange(len(source)) if indices is None else np.asarray(indices, dtype=np.intp)
+    n_frames = len(frames)
+    if n_frames == 0:
+        raise ValueError("No frames selected")
+
+    os.makedirs(output_dir, exist_ok=True)
+    maps = {}
+
+    def write_maps(aggregate, rows, frame_shape):
+        for name, values in aggregate.result().items():
+            if name not in maps:
+                maps[name] = np.lib.format.open_memmap(
+                    os.path.join(output_dir, f"{name}.npy.tmp"), mode='w+',
+                    dtype=values.dtype, shape=frame_shape)
+            maps[name][rows] = values
+
+    if hasattr(source, 'frame_shape'):
+        height, width = source.frame_shape
+        # Bands of whole rows are contiguous in every frame of the cube
+        tile_rows = int(np.clip(budget // (8 * width * min(n_frames, 256)), 1, height))
+        chunk_frames = max(1, budget // (8 * width * tile_rows))
+        n_tiles = -(-height // tile_rows)
+        completed = 0
+        for row in range(0, height, tile_rows):
+            rows = slice(row, min(row + tile_rows, height))
+            aggregate = PixelAggregate((rows.stop - rows.start, width))
+            for start in range(0, n_frames, chunk_frames):
+                chunk = frames[start:start + chunk_frames]
+                if indices is None:
+                    chunk = slice(chunk[0], chunk[-1] + 1)
+                aggregate.update(source[chunk, rows])
+                completed += min(chunk_frames, n_frames - start)
+                if progress_callback:
+                    progress_callback(completed, n_frames * n_tiles)
+            write_maps(aggregate, rows, (height, width))
+    else:
+        files = [source[i] for i in frames]
+        entry = get_catalog_entries(files[:1])[0]
+        frame_bytes = 8 * (entry['width'] or 1) * (entry['height'] or 1)
+        # The reduction of a batch needs a few float64 temporaries of its size
+        batch_size = max(1, budget // (4 * frame_bytes))
+        aggregate = None
+        completed = 0
+        for _, batch in ThermalDataHandler.iter_frames(files, camera_type, batch_size=batch_size,
+                                                       dtype=np.float64, sort=False, skip_errors=True,
+                                                       max_memory_mb=chunk_mb / 2):
+            if aggregate is None:
+                aggregate = PixelAggregate(batch.shape[1:])
+            aggregate.update(batch)
+            completed += len(batch)
+            if progress_callback:
+                progress_callback(completed, n_frames)
+        if aggregate is None:
+            raise ValueError("None of the selected files could be read")
+        write_maps(aggregate, slice(None), aggregate.count.shape)
+
+    for values in maps.values():
+        values.flush()
+    names = list(maps)
+    # Release the memory maps before the files are renamed (required on Windows)
+    maps.clear()
+    result = {}
+    for name in names:
+        path = os.path.join(output_dir, f"{name}.npy")
+        os.replace(f"{path}.tmp", path)
+        result[name] = np.load(path, mmap_mode='r')
+    return result
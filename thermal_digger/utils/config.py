@@ -26,9 +26,40 @@ class Config:
     SUPPORTED_EXTENSIONS: tuple = (".csv",)
     METADATA_ROWS: int = 8
     
+    # Frame cache settings
+    FRAME_CACHE_ENABLED: bool = True
+    FRAME_CACHE_DIR: Optional[str] = None  # None = ".thermal_cache" next to the data files
+    FRAME_STORAGE: str = "float"  # "float" or "fixed" (int16, FIXED_POINT_SCALE °C units)
+    FIXED_POINT_SCALE: float = 0.01
+    FRAME_MEMORY_CACHE_MB: int = 512  # Budget of the in-memory LRU frame cache
+    PREFETCH_FRAMES: int = 4  # Neighbouring frames loaded in the background while browsing
+    
+    # Ingest settings
+    INGEST_WORKERS: int = 0  # Worker processes for parsing files, 0 = one per CPU
+    STREAM_MEMORY_MB: int = 256  # Memory cap of the frames read ahead by ThermalDataHandler.iter_frames
+    
+    # Histogram index settings (per-frame histograms for colour ranges and percentiles)
+    HISTOGRAM_MIN: float = -50.0
+    HISTOGRAM_MAX: float = 150.0
+    HISTOGRAM_BIN_WIDTH: float = 0.1
+    PIXEL_STATS_CHUNK_MB: int = 256  # Size of the blocks read when computing per-pixel statistics
+    
+    # Follow mode settings
+    FOLLOW_POLL_SECONDS: float = 5.0  # Interval between checks of a followed directory
+    FOLLOW_MAX_ATTEMPTS: int = 3  # Times a new file that fails to load is retried before giving up
+    
+    # Cube store settings
+    CUBE_STORE_ENABLED: bool = True  # Consolidate loaded datasets into a memory-mapped cube
+    
+    # Polygon statistics: "mean", "min", "max", "median", "std" and percentiles as "pNN"
+    POLYGON_STATISTICS: tuple = ("mean", "min", "max", "median", "p5", "p95", "std")
+    
     # Plot settings
     COLORMAP: str = "binary_r"
     FIGURE_DPI: int = 600
+    INTERACTIVE_WEBGL: bool = True  # Draw interactive (HTML) plots with WebGL traces
+    INTERACTIVE_MAX_POINTS: int = 4000  # Samples per trace drawn at once in interactive plots, 0 = all
+    INTERACTIVE_DOWNSAMPLING: str = "minmax"  # "minmax" (keeps peaks) or "lttb"
     
     # Export settings
     DEFAULT_EXPORT_DIR: str = os.path.expanduser("~/Documents/ThermalAnalyzer")
@@ -59,6 +90,38 @@ def load_config() -> Config:
     # Example: Override from environment variables
     if "THERMAL_ANALYZER_COLORMAP" in os.environ:
         config.COLORMAP = os.environ["THERMAL_ANALYZER_COLORMAP"]
+    if "THERMAL_ANALYZER_POLYGON_STATISTICS" in os.environ:
+        config.POLYGON_STATISTICS = tuple(
+            name.strip().lower() for name in os.environ["THERMAL_ANALYZER_POLYGON_STATISTICS"].split(",")
+            if name.strip())
+    if "THERMAL_ANALYZER_FRAME_CACHE" in os.environ:
+        config.FRAME_CACHE_ENABLED = os.environ["THERMAL_ANALYZER_FRAME_CACHE"] not in ("0", "false", "no")
+    if "THERMAL_ANALYZER_FRAME_CACHE_DIR" in os.environ:
+        config.FRAME_CACHE_DIR = os.environ["THERMAL_ANALYZER_FRAME_CACHE_DIR"]
+    if "THERMAL_ANALYZER_FRAME_STORAGE" in os.environ:
+        config.FRAME_STORAGE = os.environ["THERMAL_ANALYZER_FRAME_STORAGE"].lower()
+    if "THERMAL_ANALYZER_FRAME_MEMORY_CACHE_MB" in os.environ:
+        config.FRAME_MEMORY_CACHE_MB = int(os.environ["THERMAL_ANALYZER_FRAME_MEMORY_CACHE_MB"])
+    if "THERMAL_ANALYZER_PREFETCH_FRAMES" in os.environ:
+        config.PREFETCH_FRAMES = int(os.environ["THERMAL_ANALYZER_PREFETCH_FRAMES"])
+    if "THERMAL_ANALYZER_FOLLOW_POLL_SECONDS" in os.environ:
+        config.FOLLOW_POLL_SECONDS = float(os.environ["THERMAL_ANALYZER_FOLLOW_POLL_SECONDS"])
+    if "THERMAL_ANALYZER_FOLLOW_MAX_ATTEMPTS" in os.environ:
+        config.FOLLOW_MAX_ATTEMPTS = int(os.environ["THERMAL_ANALYZER_FOLLOW_MAX_ATTEMPTS"])
+    if "THERMAL_ANALYZER_INGEST_WORKERS" in os.environ:
+        config.INGEST_WORKERS = int(os.environ["THERMAL_ANALYZER_INGEST_WORKERS"])
+    if "THERMAL_ANALYZER_STREAM_MEMORY_MB" in os.environ:
+        config.STREAM_MEMORY_MB = int(os.environ["THERMAL_ANALYZER_STREAM_MEMORY_MB"])
+    if "THERMAL_ANALYZER_PIXEL_STATS_CHUNK_MB" in os.environ:
+        config.PIXEL_STATS_CHUNK_MB = int(os.environ["THERMAL_ANALYZER_PIXEL_STATS_CHUNK_MB"])
+    if "THERMAL_ANALYZER_INTERACTIVE_WEBGL" in os.environ:
+        config.INTERACTIVE_WEBGL = os.environ["THERMAL_ANALYZER_INTERACTIVE_WEBGL"] not in ("0", "false", "no")
+    if "THERMAL_ANALYZER_INTERACTIVE_MAX_POINTS" in os.environ:
+        config.INTERACTIVE_MAX_POINTS = int(os.environ["THERMAL_ANALYZER_INTERACTIVE_MAX_POINTS"])
+    if "THERMAL_ANALYZER_INTERACTIVE_DOWNSAMPLING" in os.environ:
+        config.INTERACTIVE_DOWNSAMPLING = os.environ["THERMAL_ANALYZER_INTERACTIVE_DOWNSAMPLING"].lower()
+    if "THERMAL_ANALYZER_CUBE_STORE" in os.environ:
+        config.CUBE_STORE_ENABLED = os.environ["THERMAL_ANALYZER_CUBE_STORE"] not in ("0", "false", "no")
     
     return config
 
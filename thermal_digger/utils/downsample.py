@@ -0,0 +1,146 @@
+"""
+Downsampling of long time series for plotting.
+
+A plot cannot show more samples than it has pixels, so long series are
+reduced to the samples that matter visually before they are drawn:
+
+- min-max: the lowest and highest sample of each bucket of the x range,
+  which keeps every peak and dip (the drawn envelope is exact);
+- LTTB (Largest-Triangle-Three-Buckets): one sample per bucket, chosen
+  to keep the shape of the curve, for a smoother, lighter line.
+
+Functions return sorted indices into the original arrays, so several series
+sharing the same x can be reduced to the same samples. x must be ascending.
+NaN gaps are kept by min-max (a bucket with only NaN keeps one of them) and
+skipped by LTTB.
+"""
+
+import numpy as np
+
+DOWNSAMPLING_METHODS = ("minmax", "lttb")
+
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Indices of the minimum and maximum of y in each of n_buckets equal x intervals.
+
+    Parameters:
+        x (array): Ascending x values
+        y (array): Values, may contain NaN
+        n_buckets (int): Number of buckets; up to 2 samples are kept per bucket
+
+    Returns:
+        np.ndarray: Sorted indices, always including the first and last sample
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return np.arange(n)
+
+    # x is ascending, so buckets are contiguous runs of samples
+    buckets = _bucket_ids(x, n_buckets)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    finite = np.isfinite(y)
+    indices = [[0, n - 1]]
+    for fill, reduce in ((np.inf, np.minimum), (-np.inf, np.maximum)):
+        filled = np.where(finite, y, fill)
+        extremes = reduce.reduceat(filled, starts)
+        # First sample of each bucket equal to its extreme; in a bucket without
+        # finite values this is its first NaN, which keeps the gap in the line
+        hits = np.flatnonzero(filled == np.repeat(extremes, np.diff(np.r_[starts, n])))
+        _, first = np.unique(buckets[hits], return_index=True)
+        indices.append(hits[first])
+
+    return np.unique(np.concatenate(indices))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of n_out samples chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last samples are kept; in each bucket between them the
+    sample forming the largest triangle with the previously kept sample and
+    the average of the next bucket is kept.
+
+    Parameters:
+        x (array): Ascending x values
+        y (array): Values; NaN samples are skipped
+        n_out (int): Number of samples to keep (at least 3)
+
+    Returns:
+        np.ndarray: Sorted indices
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+    if n <= n_out or n_out < 3:
+        return valid
+    xv, yv = x[valid], y[valid]
+
+    # Bucket i covers [edges[i], edges[i + 1]), the first and last samples are their own buckets
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Averages of the buckets, used as the third corner of the triangles
+    sums_x = np.add.reduceat(xv[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(yv[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, xv[-1])
+    avg_y = np.append(sums_y / counts, yv[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = xv[a], yv[a]
+        areas = np.abs((ax - avg_x[i + 1]) * (yv[start:stop] - ay) - (ax - xv[start:stop]) * (avg_y[i + 1] - ay))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return valid[selected]
+
+
+def downsample_indices(x, ys, max_points, method="minmax"):
+    """
+    Indices of the samples to draw for series sharing the same x.
+
+    The samples kept for each series are merged, so all series are drawn at
+    the same x values (needed e.g. for a band filled between two series).
+
+    Parameters:
+        x (array): Ascending x values
+        ys (list): Series of the same length as x
+        max_points (int): Approximate number of samples to keep per series;
+            0 or less keeps all samples
+        method (str): "minmax" or "lttb"
+
+    Returns:
+        np.ndarray: Sorted indices
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    n = len(x)
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    indices = []
+    for y in ys:
+        if method == "minmax":
+            indices.append(minmax_indices(x, y, max(max_points // 2, 1)))
+        else:
+            indices.append(lttb_indices(x, y, max(max_points, 3)))
+    return np.unique(np.concatenate(indices)) if indices else np.arange(0)
+
+
+def _bucket_ids(x, n_buckets):
+    """Bucket of each sample, for n_buckets equal intervals of the x range"""
+    n = len(x)
+    span = x[-1] - x[0]
+    if not np.isfinite(span) or span <= 0:
+        # Equal counts when the x range is degenerate
+        return np.arange(n) * n_buckets // n
+    return np.minimum(((x - x[0]) * (n_buckets / span)).astype(np.int64), n_buckets - 1)
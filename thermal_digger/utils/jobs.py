@@ -0,0 +1,178 @@
+"""
+Background jobs for the Tk windows.
+
+Long analyses run on a small thread pool (NumPy and SciPy release the GIL in
+their heavy loops, and threads can share the loaded frames without copying
+them). Results are handed back to the Tk thread by polling with root.after,
+as Tk must only be used from the thread that created it.
+
+Jobs are submitted under a key, and a new job replaces any job with the same
+key that has not delivered yet ("latest wins"): a queued job is dropped
+before it starts, a running one is asked to stop through its cancel event
+and its result is discarded. However fast the user clicks, no backlog of
+stale computations builds up: only jobs already running finish in vain.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """Raised by job functions that stop early because their cancel event was set."""
+
+
+def check_cancelled(cancel_event):
+    """
+    Raise JobCancelled if cancel_event (a threading.Event or None) is set.
+
+    Long job functions call this between frames or blocks of work.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+
+class Job:
+    """A submitted job. `cancel_event` is set once the job is superseded or cancelled."""
+
+    def __init__(self, key, on_done=None, on_error=None, owner=None):
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.owner = owner
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    @property
+    def cancelled(self):
+        """True once the job was superseded or cancelled."""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the job to stop; it is dropped if it has not started yet."""
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class JobScheduler:
+    """Runs jobs on worker threads and delivers their results on the Tk thread."""
+
+    def __init__(self, root, max_workers=2, poll_ms=50):
+        """
+        Initialize the scheduler.
+
+        Parameters:
+            root: Tk root (or any widget) used to schedule the result polling
+            max_workers (int): Worker threads
+            poll_ms (int): Interval of the result polling while jobs are pending
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}  # Key -> latest job
+        self._results = queue.Queue()
+        self._poll_job = None
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, owner=None,
+               cancellable=False, **kwargs):
+        """
+        Run func(*args, **kwargs) on a worker thread, replacing the previous job of `key`.
+
+        func must not touch Tk widgets. on_done(result) or on_error(exception)
+        is called on the Tk thread, unless the job was superseded or cancelled
+        in the meantime or `owner` (a widget) has been destroyed.
+
+        Parameters:
+            key: Identifies the job; a new job with the same key supersedes this one
+            func (callable): The work
+            on_done (callable): Receives the result
+            on_error (callable): Receives the exception raised by func; by
+                default it is printed
+            owner: Widget the callbacks belong to
+            cancellable (bool): Pass the job's cancel event to func as
+                `cancel_event`, so it can stop early when superseded
+
+        Returns:
+            Job: The submitted job
+        """
+        self.cancel(key)
+        job = Job(key, on_done, on_error, owner)
+        self._jobs[key] = job
+        if cancellable:
+            kwargs['cancel_event'] = job.cancel_event
+
+        def run():
+            if job.cancelled:
+                return
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((job, None, e))
+            else:
+                self._results.put((job, result, None))
+
+        job.future = self._executor.submit(run)
+        self._schedule_poll()
+        return job
+
+    def cancel(self, key):
+        """Cancel the job of `key`, if any; its callbacks will not be called."""
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        """Cancel all jobs."""
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def is_pending(self, key):
+        """Return True if a job of `key` has not delivered its result yet."""
+        return key in self._jobs
+
+    def shutdown(self):
+        """Cancel all jobs and stop the worker threads."""
+        self.cancel_all()
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        """Poll for results while jobs are pending."""
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Deliver finished results on the Tk thread."""
+        self._poll_job = None
+        try:
+            while True:
+                try:
+                    job, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                # Results of superseded jobs are stale
+                if job.cancelled or self._jobs.get(job.key) is not job:
+                    continue
+                del self._jobs[job.key]
+                self._deliver(job, result, error)
+        finally:
+            if self._jobs:
+                self._schedule_poll()
+
+    def _deliver(self, job, result, error):
+        """Call the callback of a finished job; errors of the callback are reported, not raised."""
+        try:
+            if job.owner is not None and not job.owner.winfo_exists():
+                return
+            if error is not None:
+                if job.on_error is not None:
+                    job.on_error(error)
+                else:
+                    print(f"Error in background job {job.key}: {error}")
+            elif job.on_done is not None:
+                job.on_done(result)
+        except Exception as e:
+            print(f"Error handling the result of background job {job.key}: {e}")